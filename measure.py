@@ -0,0 +1,55 @@
+import argparse
+
+import numpy as np
+
+from python_algorithms.measurement.perf_stat import DEFAULT_EVENTS, supported_events
+from python_algorithms.measurement.rapl import POWERCAP_DIR, SAMPLE_INTERVAL, find_domains
+from python_algorithms.measurement.runner import run_experiment
+from python_algorithms.measurement.campaign import MAX_RUNS, MIN_RUNS, TARGET_RELATIVE_WIDTH, run_campaign
+
+# replaces "sudo energy-toolkit ..." for the experiments in measurements/, must be run as root to read the RAPL counters
+parser = argparse.ArgumentParser()
+parser.add_argument("experiment", help="yaml file of an experiment, e.g. measurements/cache_efficiency/cache_efficiency.yaml")
+parser.add_argument("--runs", "-n", default=12, help="number of runs of every program")
+parser.add_argument("--program", "-p", nargs="+", default=None, help="only run the programs with these indices")
+parser.add_argument("--output_dir", "-o", default=None, help="directory of the numbered result directories, defaults to the directory of the yaml")
+parser.add_argument("--domain", "-d", nargs="+", default=None, help="RAPL domains to sum up, e.g. package-0 dram, defaults to all packages")
+parser.add_argument("--cpu", default=None, help="pin the measured program to this cpu")
+parser.add_argument("--interval", default=SAMPLE_INTERVAL, help="seconds between two samples of the energy counters")
+parser.add_argument("--perf_stat", action="store_true", help="run the programs under perf stat and write the hardware counters to counters.csv")
+parser.add_argument("--events", "-e", nargs="+", default=DEFAULT_EVENTS, help="perf events for --perf_stat")
+parser.add_argument("--adaptive", action="store_true", help="run the programs interleaved in rounds until their confidence intervals converge, "
+                                                           "progress is checkpointed to campaign.json and resumed")
+parser.add_argument("--min_runs", default=MIN_RUNS, help="minimum number of runs of every program with --adaptive")
+parser.add_argument("--max_runs", default=MAX_RUNS, help="maximum number of runs of every program with --adaptive")
+parser.add_argument("--target_width", default=TARGET_RELATIVE_WIDTH, help="relative width of the 95%% confidence intervals of time and energy with --adaptive")
+parser.add_argument("--powercap_dir", default=POWERCAP_DIR)
+
+args = parser.parse_args()
+domains = find_domains(args.powercap_dir, args.domain)
+print(f"Measuring the domains {', '.join(domain.name for domain in domains)}.")
+
+events = None
+if args.perf_stat:
+    events = supported_events(args.events)
+    if events:
+        print(f"Counting the perf events {', '.join(events)}.")
+    else:
+        print("[Warning] perf stat cannot count any of the events here, only time and energy are measured.")
+
+selected_programs = None if args.program is None else [int(program) for program in args.program]
+cpu = None if args.cpu is None else int(args.cpu)
+if args.adaptive:
+    all_runs = run_campaign(args.experiment, domains, args.output_dir, selected_programs, int(args.min_runs), int(args.max_runs),
+                            float(args.target_width), cpu=cpu, interval=float(args.interval), events=events)
+else:
+    all_runs = run_experiment(args.experiment, domains, int(args.runs), args.output_dir, selected_programs, cpu,
+                              float(args.interval), events=events)
+
+for i, runs in all_runs.items():
+    total_time = sum(run.time for run in runs)
+    sampling_time = sum(run.sampling_time for run in runs)
+    runner_cpu_time = sum(run.runner_cpu_time for run in runs)
+    print(f"Program {i}: {len(runs)} runs, {np.mean([run.time for run in runs])} s and {np.mean([run.energy for run in runs])} J per run, "
+          f"the runner spent {sampling_time} s sampling ({sum(run.samples for run in runs)} samples) and "
+          f"{runner_cpu_time} s cpu time, {100 * runner_cpu_time / total_time:.3f} % of the measured time.")
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def insertion_sort(a: list[int]) -> None:
     for i in range(1, len(a)):
         reference_value: int = a[i]
@@ -7,7 +10,21 @@ def insertion_sort(a: list[int]) -> None:
             j -= 1
         a[j] = reference_value
 
+def numpy_insertion_sort(a: np.ndarray) -> None:
+    # binary insertion sort: the insert position is found with a binary search on the sorted prefix
+    # and the larger elements are shifted with one slice move instead of element by element
+    for i in range(1, len(a)):
+        reference_value = a[i]
+        j = int(np.searchsorted(a[:i], reference_value, side="right"))
+        if j < i:
+            a[j+1:i+1] = a[j:i]
+            a[j] = reference_value
+
 if __name__ == "__main__":
     x = [8, 5, 7, 1, 9, 3]
     insertion_sort(x)
     print(x)
+
+    y = np.array([8, 5, 7, 1, 9, 3], dtype=np.uint32)
+    numpy_insertion_sort(y)
+    print(y)
@@ -0,0 +1,103 @@
+import dataclasses
+import hashlib
+import json
+import os
+from statistics import NormalDist
+
+import numpy as np
+
+from python_algorithms.measurement.rapl import SAMPLE_INTERVAL, EnergySampler, RaplDomain
+from python_algorithms.measurement.runner import Run, read_programs, run_program, write_results
+
+CHECKPOINT_FILENAME = "campaign.json"
+MIN_RUNS = 3
+MAX_RUNS = 30
+CONFIDENCE = 0.95
+# the campaign stops a program once the confidence intervals of its mean time and energy are at most this wide
+# relative to the mean, same default as TARGET_RELATIVE_WIDTH of webapp/energy_efficient_algorithms/measurement_analysis.py
+TARGET_RELATIVE_WIDTH = 0.02
+
+
+def relative_ci_width(values: list[float], confidence: float = CONFIDENCE) -> float:
+    # width of the normal confidence interval of the mean relative to the mean
+    if len(values) < 2:
+        return np.inf
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    mean = abs(np.mean(values))
+    return np.inf if mean == 0 else 2 * z * np.std(values, ddof=1) / np.sqrt(len(values)) / mean
+
+
+def is_converged(runs: list[Run], min_runs: int, max_runs: int, target_relative_width: float, confidence: float = CONFIDENCE) -> bool:
+    if len(runs) >= max_runs:
+        return True
+    if len(runs) < min_runs:
+        return False
+    return all(relative_ci_width([getattr(run, column) for run in runs], confidence) <= target_relative_width for column in ["time", "energy"])
+
+
+def _experiment_hash(experiment_file: str) -> str:
+    with open(experiment_file, "rb") as yaml_file:
+        return hashlib.sha256(yaml_file.read()).hexdigest()
+
+
+def load_checkpoint(filename: str, experiment_hash: str) -> dict[int, list[Run]]:
+    # the runs of an interrupted campaign; a checkpoint of a changed yaml is ignored
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "r") as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    if checkpoint["experiment_hash"] != experiment_hash:
+        return {}
+    return {int(i): [Run(**run) for run in runs] for i, runs in checkpoint["runs"].items()}
+
+
+def save_checkpoint(filename: str, experiment_hash: str, runs: dict[int, list[Run]], finished: set[int]) -> None:
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, "w") as checkpoint_file:
+        json.dump({
+            "experiment_hash": experiment_hash,
+            "finished": sorted(finished),
+            "runs": {str(i): [dataclasses.asdict(run) for run in program_runs] for i, program_runs in runs.items()},
+        }, checkpoint_file)
+    os.replace(tmp_filename, filename)
+
+
+def run_campaign(experiment_file: str, domains: list[RaplDomain], output_dir: None | str = None, programs: None | list[int] = None,
+                 min_runs: int = MIN_RUNS, max_runs: int = MAX_RUNS, target_relative_width: float = TARGET_RELATIVE_WIDTH,
+                 confidence: float = CONFIDENCE, cpu: None | int = None, interval: float = SAMPLE_INTERVAL, cwd: None | str = None,
+                 events: None | list[str] = None, seed: int = 0, log=print) -> dict[int, list[Run]]:
+    # runs all programs in rounds, every round runs each unfinished program once in a shuffled order so that
+    # thermal drift is spread over all programs; a program is finished once is_converged holds. Every run is
+    # checkpointed to <output_dir>/campaign.json, an interrupted campaign continues from there
+    output_dir = os.path.dirname(experiment_file) if output_dir is None else output_dir
+    experiment_programs = read_programs(experiment_file)
+    selected = [i for i in range(len(experiment_programs)) if programs is None or i in programs]
+    experiment_hash = _experiment_hash(experiment_file)
+    checkpoint_filename = os.path.join(output_dir, CHECKPOINT_FILENAME)
+    os.makedirs(output_dir, exist_ok=True)
+
+    runs = load_checkpoint(checkpoint_filename, experiment_hash)
+    for i in selected:
+        runs.setdefault(i, [])
+    resumed = sum(len(runs[i]) for i in selected)
+    if resumed > 0:
+        log(f"Resuming the campaign with {resumed} runs from {checkpoint_filename}.")
+
+    sampler = EnergySampler(domains, interval)
+    rng = np.random.default_rng(seed)
+    finished = {i for i in selected if is_converged(runs[i], min_runs, max_runs, target_relative_width, confidence)}
+    round_number = 0
+    while len(finished) < len(selected):
+        round_number += 1
+        for i in rng.permutation([i for i in selected if i not in finished]):
+            i = int(i)
+            runs[i].append(run_program(experiment_programs[i], sampler, cpu, cwd, events))
+            if is_converged(runs[i], min_runs, max_runs, target_relative_width, confidence):
+                finished.add(i)
+                write_results(os.path.join(output_dir, str(i)), runs[i])
+                log(f"Program {i} finished after {len(runs[i])} runs in round {round_number}.")
+            save_checkpoint(checkpoint_filename, experiment_hash, runs, finished)
+
+    for i in selected:
+        write_results(os.path.join(output_dir, str(i)), runs[i])
+    return {i: runs[i] for i in selected}
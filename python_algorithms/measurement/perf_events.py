@@ -0,0 +1,73 @@
+import ctypes
+import os
+import platform
+import struct
+
+# hardware counters of the calling thread through the perf_event_open syscall, see man perf_event_open
+SYSCALL_PERF_EVENT_OPEN = {"x86_64": 298, "aarch64": 241}
+PERF_TYPE_HARDWARE = 0
+PERF_TYPE_HW_CACHE = 3
+PERF_FLAG_FD_CLOEXEC = 8
+# bits of the flags field of perf_event_attr
+EXCLUDE_KERNEL = 1 << 5
+EXCLUDE_HV = 1 << 6
+
+PERF_COUNT_HW_CPU_CYCLES = 0
+PERF_COUNT_HW_INSTRUCTIONS = 1
+PERF_COUNT_HW_CACHE_MISSES = 3
+# PERF_TYPE_HW_CACHE configs are cache | (operation << 8) | (result << 16)
+PERF_COUNT_HW_CACHE_L1D = 0
+PERF_COUNT_HW_CACHE_LL = 2
+PERF_COUNT_HW_CACHE_OP_READ = 0
+PERF_COUNT_HW_CACHE_RESULT_MISS = 1
+
+EVENTS = {
+    "cycles": (PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES),
+    "instructions": (PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS),
+    "cache-misses": (PERF_TYPE_HARDWARE, PERF_COUNT_HW_CACHE_MISSES),
+    "L1-dcache-load-misses": (PERF_TYPE_HW_CACHE, PERF_COUNT_HW_CACHE_L1D | PERF_COUNT_HW_CACHE_OP_READ << 8 | PERF_COUNT_HW_CACHE_RESULT_MISS << 16),
+    "LLC-load-misses": (PERF_TYPE_HW_CACHE, PERF_COUNT_HW_CACHE_LL | PERF_COUNT_HW_CACHE_OP_READ << 8 | PERF_COUNT_HW_CACHE_RESULT_MISS << 16),
+}
+
+# the first version of perf_event_attr (PERF_ATTR_SIZE_VER0): type, size, config, sample_period, sample_type,
+# read_format, flags, wakeup_events, bp_type, config1
+_ATTR = struct.Struct("<IIQQQQQIIQ")
+
+
+def _syscall_number() -> int:
+    machine = platform.machine()
+    if machine not in SYSCALL_PERF_EVENT_OPEN:
+        raise OSError(f"perf_event_open is not supported on {machine}")
+    return SYSCALL_PERF_EVENT_OPEN[machine]
+
+
+class PerfCounter:
+    # a counter of one event for the calling process, counting starts when it is opened
+
+    def __init__(self, event: str):
+        event_type, config = EVENTS[event]
+        attr = ctypes.create_string_buffer(_ATTR.pack(event_type, _ATTR.size, config, 0, 0, 0, EXCLUDE_KERNEL | EXCLUDE_HV, 0, 0, 0))
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.syscall(_syscall_number(), attr, 0, -1, -1, PERF_FLAG_FD_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"perf_event_open({event}) failed: {os.strerror(errno)}")
+        self.event = event
+        self.fd = fd
+
+    def read(self) -> int:
+        return struct.unpack("<Q", os.read(self.fd, 8))[0]
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_counters(events: list[str]) -> dict[str, PerfCounter]:
+    # events that are not available (no pmu in a vm or container, perf_event_paranoid) are left out
+    counters = {}
+    for event in events:
+        try:
+            counters[event] = PerfCounter(event)
+        except OSError:
+            pass
+    return counters
@@ -0,0 +1,49 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+# generic perf event names, perf maps them to the pmu of the cpu (Intel and AMD)
+DEFAULT_EVENTS = ["cycles", "instructions", "L1-dcache-load-misses", "LLC-load-misses"]
+
+
+def perf_stat_command(command: list[str], events: list[str], output_filename: str) -> list[str]:
+    # -x, prints one csv line per event: count,unit,event,run time,percentage,...
+    return ["perf", "stat", "-x,", "-e", ",".join(events), "-o", output_filename, "--", *command]
+
+
+def parse_perf_stat(text: str, events: list[str]) -> dict[str, float]:
+    # events that perf could not count ("<not supported>", "<not counted>") are nan
+    counters = {event: np.nan for event in events}
+    for line in text.splitlines():
+        fields = line.split(",")
+        if line.startswith("#") or len(fields) < 3:
+            continue
+        # perf appends modifiers like cycles:u to the event name
+        event = fields[2].split(":")[0]
+        if event in counters:
+            try:
+                counters[event] = float(fields[0])
+            except ValueError:
+                pass
+    return counters
+
+
+def supported_events(events: list[str]) -> list[str]:
+    # the events that perf stat can count on this machine (perf may be missing, the pmu may be hidden in a vm
+    # or perf_event_paranoid may be too strict); an empty list means the measurements fall back to time and energy only
+    if shutil.which("perf") is None:
+        return []
+    output_fd, output_filename = tempfile.mkstemp(suffix=".csv")
+    os.close(output_fd)
+    try:
+        subprocess.run(perf_stat_command(["true"], events, output_filename), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        with open(output_filename, "r") as output_file:
+            counters = parse_perf_stat(output_file.read(), events)
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    finally:
+        os.remove(output_filename)
+    return [event for event in events if not np.isnan(counters[event])]
@@ -0,0 +1,141 @@
+import atexit
+import contextlib
+import csv
+import time
+
+import numpy as np
+
+from python_algorithms.measurement.perf_events import open_counters
+from python_algorithms.measurement.rapl import POWERCAP_DIR, find_domains
+
+RING_BUFFER_CAPACITY = 1 << 16
+CACHE_MISS_EVENT = "cache-misses"
+PROFILE_COLUMNS = ["Region", "Start", "Time", "CpuTime", "Energy", "CacheMisses"]
+
+# one record per finished region; energy and cache misses are nan when the counters are not readable
+RECORD_DTYPE = np.dtype([("region", np.int32), ("start", np.float64), ("time", np.float64), ("cpu_time", np.float64),
+                         ("energy", np.float64), ("cache_misses", np.float64)])
+
+
+class Profiler:
+    # regions are recorded into a preallocated ring buffer, so recording never allocates; when more than
+    # capacity regions are recorded before a flush, the oldest ones are overwritten and counted as dropped
+
+    def __init__(self, filename: None | str = None, capacity: int = RING_BUFFER_CAPACITY, cache_misses: bool = False,
+                 powercap_dir: str = POWERCAP_DIR):
+        self.filename = filename
+        self.records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.count = 0
+        self.dropped = 0
+        self.region_names = {}
+        try:
+            self.domains = find_domains(powercap_dir)
+        except (RuntimeError, OSError):
+            self.domains = []
+        self.cache_miss_counter = open_counters([CACHE_MISS_EVENT]).get(CACHE_MISS_EVENT) if cache_misses else None
+        self.start_time = time.perf_counter()
+
+    def _read_energy_uj(self) -> list[int]:
+        return [domain.read_uj() for domain in self.domains]
+
+    def _energy(self, start: list[int], end: list[int]) -> float:
+        # assumes that a region is shorter than one counter wraparound (minutes at full load)
+        if not self.domains:
+            return np.nan
+        return sum((e - s) % (domain.max_energy_range_uj + 1) for domain, s, e in zip(self.domains, start, end)) / 1e6
+
+    def _read_cache_misses(self) -> float:
+        return np.nan if self.cache_miss_counter is None else self.cache_miss_counter.read()
+
+    def record(self, name: str, start: float, wall_time: float, cpu_time: float, energy: float, cache_misses: float) -> None:
+        region = self.region_names.setdefault(name, len(self.region_names))
+        capacity = len(self.records)
+        if self.count >= capacity:
+            self.dropped += 1
+        self.records[self.count % capacity] = (region, start - self.start_time, wall_time, cpu_time, energy, cache_misses)
+        self.count += 1
+
+    @contextlib.contextmanager
+    def region(self, name: str):
+        start_energy = self._read_energy_uj()
+        start_cache_misses = self._read_cache_misses()
+        start_cpu_time = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            end_cpu_time = time.process_time()
+            end_cache_misses = self._read_cache_misses()
+            end_energy = self._read_energy_uj()
+            self.record(name, start, end - start, end_cpu_time - start_cpu_time, self._energy(start_energy, end_energy),
+                        end_cache_misses - start_cache_misses)
+
+    def snapshot(self) -> np.ndarray:
+        # the buffered records in the order they were recorded
+        capacity = len(self.records)
+        if self.count <= capacity:
+            return self.records[:self.count].copy()
+        return np.roll(self.records, -(self.count % capacity))
+
+    def flush(self) -> None:
+        if self.filename is None or self.count == 0:
+            return
+        names = {region: name for name, region in self.region_names.items()}
+        with open(self.filename, "w", newline="") as profile_file:
+            profile_file.write(f"# {','.join(PROFILE_COLUMNS)}\n")
+            writer = csv.writer(profile_file)
+            for record in self.snapshot():
+                writer.writerow([names[int(record["region"])], *(float(record[column]) for column in RECORD_DTYPE.names[1:])])
+        if self.dropped:
+            print(f"The profile ring buffer overflowed, the first {self.dropped} regions are missing in {self.filename}.")
+        self.count = 0
+        self.dropped = 0
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # totals per region name
+        names = {region: name for name, region in self.region_names.items()}
+        records = self.snapshot()
+        totals = {}
+        for region in np.unique(records["region"]):
+            selected = records[records["region"] == region]
+            totals[names[int(region)]] = {column: float(selected[column].sum()) for column in RECORD_DTYPE.names[2:]}
+        return totals
+
+
+_profiler = None
+
+
+def configure_profiling(filename: None | str = None, capacity: int = RING_BUFFER_CAPACITY, cache_misses: bool = False,
+                        powercap_dir: str = POWERCAP_DIR) -> Profiler:
+    # the profile is written to filename when the interpreter exits
+    global _profiler
+    if _profiler is not None:
+        _profiler.flush()
+    _profiler = Profiler(filename, capacity, cache_misses, powercap_dir)
+    atexit.register(_profiler.flush)
+    return _profiler
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+class profile_region(contextlib.ContextDecorator):
+    # with profile_region("sort"): ... or @profile_region("sort"), records into the configured profiler
+
+    def __init__(self, name: str):
+        self.name = name
+        self._regions = []
+
+    def __enter__(self):
+        region = get_profiler().region(self.name)
+        region.__enter__()
+        self._regions.append(region)
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._regions.pop().__exit__(*exc_info)
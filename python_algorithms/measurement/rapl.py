@@ -0,0 +1,88 @@
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+POWERCAP_DIR = "/sys/class/powercap"
+# Intel and AMD (amd_energy/powercap since Linux 5.8) both expose their zones as intel-rapl:<package>[:<subzone>]
+ZONE_PATTERN = "intel-rapl:*"
+# a counter wraps after max_energy_range_uj, which takes minutes at full load, so sampling every second never misses a wrap
+SAMPLE_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class RaplDomain:
+    name: str
+    path: str
+    max_energy_range_uj: int
+
+    def read_uj(self) -> int:
+        with open(os.path.join(self.path, "energy_uj"), "r") as energy_file:
+            return int(energy_file.read())
+
+
+def find_domains(powercap_dir: str = POWERCAP_DIR, names: None | list[str] = None) -> list[RaplDomain]:
+    # by default only the package zones (intel-rapl:0, intel-rapl:1, ...) are measured, their subzones are contained in them
+    domains = []
+    for path in sorted(glob.glob(os.path.join(powercap_dir, ZONE_PATTERN))):
+        with open(os.path.join(path, "name"), "r") as name_file:
+            name = name_file.read().strip()
+        with open(os.path.join(path, "max_energy_range_uj"), "r") as range_file:
+            max_energy_range_uj = int(range_file.read())
+        is_package = os.path.basename(path).count(":") == 1
+        if (names is None and is_package) or (names is not None and name in names):
+            domains.append(RaplDomain(name, path, max_energy_range_uj))
+
+    if not domains:
+        raise RuntimeError(f"no RAPL domains {'' if names is None else ', '.join(names)} found in {powercap_dir}")
+    try:
+        domains[0].read_uj()
+    except PermissionError as error:
+        raise RuntimeError(f"cannot read {domains[0].path}/energy_uj, the RAPL counters are only readable as root") from error
+    return domains
+
+
+class EnergySampler:
+    # accumulates the energy of all domains between start() and stop(); a background thread samples the counters
+    # every interval seconds so that counter wraparounds are never missed, the time spent sampling is accounted for
+
+    def __init__(self, domains: list[RaplDomain], interval: float = SAMPLE_INTERVAL):
+        self.domains = domains
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last = []
+        self.energy_uj = [0] * len(domains)
+        self.samples = 0
+        self.sampling_time = 0.0
+
+    def _sample(self) -> None:
+        start_sample = time.perf_counter()
+        values = [domain.read_uj() for domain in self.domains]
+        for i, (domain, last, value) in enumerate(zip(self.domains, self._last, values)):
+            # the counter restarts at 0 after max_energy_range_uj
+            self.energy_uj[i] += (value - last) % (domain.max_energy_range_uj + 1)
+        self._last = values
+        self.samples += 1
+        self.sampling_time += time.perf_counter() - start_sample
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self.energy_uj = [0] * len(self.domains)
+        self.samples = 0
+        self.sampling_time = 0.0
+        self._last = [domain.read_uj() for domain in self.domains]
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> float:
+        # returns the energy in joule
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+        return sum(self.energy_uj) / 1e6
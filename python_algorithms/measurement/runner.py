@@ -0,0 +1,151 @@
+import csv
+import os
+import resource
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import yaml
+
+from python_algorithms.measurement.perf_stat import parse_perf_stat, perf_stat_command
+from python_algorithms.measurement.rapl import SAMPLE_INTERVAL, EnergySampler, RaplDomain
+
+RESULT_COLUMNS = ["Time", "Energy"]
+STATISTICS = ["mean", "variance", "std_deviation"]
+OVERHEAD_COLUMNS = ["Samples", "SamplingTime", "RunnerCpuTime"]
+
+
+@dataclass(frozen=True)
+class Program:
+    # one entry of the programs list of a measurements/<experiment>/<experiment>.yaml
+    executable: str
+    args: list[str]
+    input: str = ""
+
+    def command(self) -> list[str]:
+        return [self.executable, *self.args]
+
+
+@dataclass
+class Run:
+    time: float
+    energy: float
+    samples: int
+    sampling_time: float
+    runner_cpu_time: float
+    # hardware counters of perf stat, empty without perf
+    counters: dict[str, float] = field(default_factory=dict)
+
+
+def read_programs(filename: str) -> list[Program]:
+    # the yaml schema of energy-toolkit, including its spelling of "executeable"
+    with open(filename, "r") as experiment_file:
+        programs = yaml.safe_load(experiment_file)["programs"]
+    return [Program(str(program["executeable"]), list(map(str, program["args"])), program.get("input") or "") for program in programs]
+
+
+def write_programs(filename: str, programs: list[Program]) -> None:
+    # the inverse of read_programs, for experiments that are measured in process (text_index.py extract)
+    with open(filename, "w") as experiment_file:
+        yaml.safe_dump({"programs": [{"executeable": program.executable, "args": program.args, "input": program.input} for program in programs]},
+                       experiment_file, sort_keys=False, default_flow_style=None)
+
+
+def _runner_cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_program(program: Program, sampler: EnergySampler, cpu: None | int = None, cwd: None | str = None,
+                events: None | list[str] = None) -> Run:
+    # the program is started before the counters are read so that fork and exec of the runner are not measured;
+    # the cpu time of the runner process during the run (sampling thread, waiting) is reported as overhead.
+    # With events the program runs under perf stat, whose own start-up is then part of the measured time and energy
+    command = program.command()
+    if events:
+        perf_fd, perf_filename = tempfile.mkstemp(suffix=".csv")
+        os.close(perf_fd)
+        command = perf_stat_command(command, events, perf_filename)
+    preexec_fn = None if cpu is None else (lambda: os.sched_setaffinity(0, {cpu}))
+    stdin = subprocess.PIPE if program.input else subprocess.DEVNULL
+    process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.DEVNULL, cwd=cwd, preexec_fn=preexec_fn)
+
+    start_cpu_time = _runner_cpu_time()
+    start_time = time.perf_counter()
+    sampler.start()
+    if program.input:
+        process.communicate(program.input.encode())
+    returncode = process.wait()
+    energy = sampler.stop()
+    end_time = time.perf_counter()
+    runner_cpu_time = _runner_cpu_time() - start_cpu_time
+
+    counters = {}
+    if events:
+        with open(perf_filename, "r") as perf_file:
+            counters = parse_perf_stat(perf_file.read(), events)
+        os.remove(perf_filename)
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, program.command())
+    return Run(end_time - start_time, energy, sampler.samples, sampler.sampling_time, runner_cpu_time, counters)
+
+
+def run_in_process(function, sampler: None | EnergySampler) -> Run:
+    # like run_program for a function of this process; the sampler thread runs in this process as well, so its sampling
+    # time stands in for the runner cpu time. Without RAPL (sampler None) the energy is nan
+    start_time = time.perf_counter()
+    if sampler is not None:
+        sampler.start()
+    function()
+    energy = sampler.stop() if sampler is not None else np.nan
+    end_time = time.perf_counter()
+    samples, sampling_time = (sampler.samples, sampler.sampling_time) if sampler is not None else (0, 0.0)
+    return Run(end_time - start_time, energy, samples, sampling_time, sampling_time)
+
+
+def write_results(program_dir: str, runs: list[Run]) -> None:
+    # same files as energy-toolkit: results.csv with one row per run, statistics.csv with mean, variance and std_deviation
+    os.makedirs(program_dir, exist_ok=True)
+    values = np.array([[run.time, run.energy] for run in runs], dtype=np.float64)
+
+    with open(os.path.join(program_dir, "results.csv"), "w", newline="") as results_file:
+        results_file.write(f"# {','.join(RESULT_COLUMNS)}\n")
+        csv.writer(results_file).writerows(values.tolist())
+
+    with open(os.path.join(program_dir, "statistics.csv"), "w", newline="") as statistics_file:
+        statistics_file.write(f"# Value,{','.join(RESULT_COLUMNS)}\n")
+        writer = csv.writer(statistics_file)
+        writer.writerow(["mean", *values.mean(axis=0).tolist()])
+        writer.writerow(["variance", *values.var(axis=0).tolist()])
+        writer.writerow(["std_deviation", *values.std(axis=0).tolist()])
+
+    with open(os.path.join(program_dir, "overhead.csv"), "w", newline="") as overhead_file:
+        overhead_file.write(f"# {','.join(OVERHEAD_COLUMNS)}\n")
+        csv.writer(overhead_file).writerows([run.samples, run.sampling_time, run.runner_cpu_time] for run in runs)
+
+    # perf stat counters next to the energy csvs, one row per run like results.csv
+    events = list(runs[0].counters) if runs else []
+    if events:
+        with open(os.path.join(program_dir, "counters.csv"), "w", newline="") as counters_file:
+            counters_file.write(f"# {','.join(events)}\n")
+            csv.writer(counters_file).writerows([run.counters[event] for event in events] for run in runs)
+
+
+def run_experiment(experiment_file: str, domains: list[RaplDomain], runs: int, output_dir: None | str = None,
+                   programs: None | list[int] = None, cpu: None | int = None, interval: float = SAMPLE_INTERVAL,
+                   cwd: None | str = None, events: None | list[str] = None) -> dict[int, list[Run]]:
+    # writes the results of the i-th program to <output_dir>/<i>, by default next to the yaml like measurements/
+    output_dir = os.path.dirname(experiment_file) if output_dir is None else output_dir
+    experiment_programs = read_programs(experiment_file)
+    sampler = EnergySampler(domains, interval)
+
+    all_runs = {}
+    for i, program in enumerate(experiment_programs):
+        if programs is not None and i not in programs:
+            continue
+        all_runs[i] = [run_program(program, sampler, cpu, cwd, events) for _ in range(runs)]
+        write_results(os.path.join(output_dir, str(i)), all_runs[i])
+    return all_runs
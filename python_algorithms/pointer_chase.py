@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+
+# the working set sizes of the cache efficiency experiments in measurements/cache_efficiency
+WORKING_SET_SIZES = {
+    "32KB": 32 * 1024,
+    "512KB": 512 * 1024,
+    "4MB": 4 * 1024**2,
+    "32MB": 32 * 1024**2,
+    "256MB": 256 * 1024**2,
+}
+
+def single_cycle_permutation(size: int, seed: int, lanes: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    # next_idx[i] is the successor of i and all elements lie on one cycle, so a walk visits the whole working set;
+    # additionally returns the start indices of lanes walks that are spaced evenly on the cycle
+    count = size // np.dtype(np.uint32).itemsize
+    lanes = max(1, min(lanes, count))
+    order = np.arange(count, dtype=np.uint32)
+    np.random.default_rng(seed).shuffle(order)
+
+    next_idx = np.empty(count, dtype=np.uint32)
+    next_idx[order[:-1]] = order[1:]
+    next_idx[order[-1]] = order[0]
+
+    starts = order[np.arange(lanes, dtype=np.int64) * (count // lanes)]
+    return next_idx, starts
+
+def chase(next_idx: np.ndarray, starts: np.ndarray, iterations: int, warmup: int = 1_000_000) -> tuple[float, int]:
+    # every step advances all lanes with one gather, so the interpreter overhead is shared by all lanes; the cache
+    # misses of the lanes overlap, so the time per access is the memory throughput of independent loads and not the
+    # latency of dependent loads of ./bin/TestingAlgorithms chase (with one lane the interpreter dominates instead).
+    # Returns the elapsed time of the timed walk and its number of accesses
+    lanes = len(starts)
+    idx = starts.copy()
+
+    for _ in range(max(1, warmup // lanes)):
+        np.take(next_idx, idx, out=idx)
+
+    steps = max(1, iterations // lanes)
+    start_access = time.perf_counter()
+    for _ in range(steps):
+        np.take(next_idx, idx, out=idx)
+    end_access = time.perf_counter()
+
+    return end_access - start_access, steps * lanes
+
+def chase_throughput_curve(sizes: dict[str, int], iterations: int, lanes: int = 1024, seed: int = 42) -> dict[str, float]:
+    # ns per access of the lanes together for every working set size, see chase
+    ns_per_access = {}
+    for label, size in sizes.items():
+        next_idx, starts = single_cycle_permutation(size, seed, lanes)
+        elapsed, accesses = chase(next_idx, starts, iterations)
+        ns_per_access[label] = elapsed / accesses * 1e9
+        del next_idx
+
+    return ns_per_access
+
+if __name__ == "__main__":
+    for label, ns in chase_throughput_curve(WORKING_SET_SIZES, 10_000_000).items():
+        print(f"{label}: {ns:.3f} ns/access (throughput of independent walks, not the latency)")
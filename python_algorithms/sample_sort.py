@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# below this size the pool overhead dominates and numpy sorts directly
+MIN_PARALLEL_SIZE = 1 << 16
+OVERSAMPLING_FACTOR = 16
+BUCKETS_PER_WORKER = 4
+
+_executors: dict[int, ProcessPoolExecutor] = {}
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    # the pool is kept alive between calls, so that repeated sorts do not pay the process start-up again
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[workers]
+
+def _sort_bucket(shm_name: str, n: int, dtype: str, begin: int, end: int) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        bucket = np.ndarray((n,), dtype=dtype, buffer=shm.buf)[begin:end]
+        bucket.sort()
+        del bucket # the buffer must not be referenced anymore when the shared memory is closed
+    finally:
+        shm.close()
+
+def select_splitters(a: np.ndarray, k: int, seed: int = 0) -> np.ndarray:
+    # sorted random sample of size oversampling * k, every oversampling-th element is a splitter
+    rng = np.random.default_rng(seed)
+    sample = np.sort(a[rng.integers(0, len(a), size=OVERSAMPLING_FACTOR * k)])
+    return np.unique(sample[OVERSAMPLING_FACTOR::OVERSAMPLING_FACTOR][:k - 1])
+
+def classify(a: np.ndarray, splitters: np.ndarray) -> np.ndarray:
+    # bucket i contains the elements in [splitters[i-1], splitters[i]), the search is done for all elements at once
+    bucket_ids = np.searchsorted(splitters, a, side="right")
+    return bucket_ids.astype(np.uint16 if len(splitters) < 2**16 else np.uint32)
+
+def sample_sort(a: np.ndarray, workers: None | int = None) -> None:
+    # super scalar sample sort style: classify all elements with a vectorized splitter search, distribute them
+    # into their buckets inside a shared memory block and sort the buckets in parallel in a process pool
+    n = len(a)
+    workers = os.cpu_count() if workers is None else workers
+    if n < MIN_PARALLEL_SIZE or workers <= 1:
+        a.sort()
+        return
+
+    splitters = select_splitters(a, BUCKETS_PER_WORKER * workers)
+    bucket_ids = classify(a, splitters)
+    bucket_bounds = np.zeros(len(splitters) + 2, dtype=np.int64)
+    np.cumsum(np.bincount(bucket_ids, minlength=len(splitters) + 1), out=bucket_bounds[1:])
+
+    shm = shared_memory.SharedMemory(create=True, size=a.nbytes)
+    try:
+        distributed = np.ndarray((n,), dtype=a.dtype, buffer=shm.buf)
+        # a stable sort of small integer keys is a radix sort in numpy, i.e. a linear time distribution
+        np.take(a, np.argsort(bucket_ids, kind="stable"), out=distributed)
+
+        executor = get_executor(workers)
+        futures = [executor.submit(_sort_bucket, shm.name, n, a.dtype.str, int(begin), int(end))
+                   for begin, end in zip(bucket_bounds[:-1], bucket_bounds[1:]) if end - begin > 1]
+        for future in futures:
+            future.result()
+
+        a[:] = distributed
+        del distributed
+    finally:
+        shm.close()
+        shm.unlink()
+
+if __name__ == "__main__":
+    x = np.random.RandomState(5).randint(0, 2**32, size=1_000_000, dtype=np.uint32)
+    sample_sort(x, workers=4)
+    print(bool(np.all(x[:-1] <= x[1:])))
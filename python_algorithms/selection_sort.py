@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def selection_sort(a: list[int]) -> None:
     for i in range(len(a) - 1):
         smallest: None | int = None
@@ -10,7 +13,19 @@ def selection_sort(a: list[int]) -> None:
         a[i] = a[smallest_index]
         a[smallest_index] = old_i
 
+def numpy_selection_sort(a: np.ndarray) -> None:
+    # the smallest element of the remaining suffix is found with one argmin instead of an inner loop
+    for i in range(len(a) - 1):
+        smallest_index = i + int(np.argmin(a[i:]))
+        old_i = a[i]
+        a[i] = a[smallest_index]
+        a[smallest_index] = old_i
+
 if __name__ == "__main__":
     x = [8, 5, 7, 1, 9, 3]
     selection_sort(x)
     print(x)
+
+    y = np.array([8, 5, 7, 1, 9, 3], dtype=np.uint32)
+    numpy_selection_sort(y)
+    print(y)
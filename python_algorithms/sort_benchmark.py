@@ -0,0 +1,80 @@
+import csv
+import os
+import time
+
+import numpy as np
+
+from python_algorithms.sort_registry import SortAlgorithm, prepare_input
+
+
+def generate_array(n: int, seed: int) -> np.ndarray:
+    # generates the same arrays as the c++ version
+    rng = np.random.RandomState(seed)
+    return (rng.randint(0, 2**32, size=n, dtype=np.uint32) % n).astype(np.uint32)
+
+def load_array(n: int, seed: int, cache_dir: None | str = None) -> np.ndarray:
+    # generated arrays are cached as .npy files keyed by (n, seed) and opened memory-mapped
+    if cache_dir is None:
+        return generate_array(n, seed)
+
+    cache_filename = os.path.join(cache_dir, f"sort_input_n{n}_s{seed}.npy")
+    if not os.path.exists(cache_filename):
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to a temporary file first so that concurrent runs never read a half written array
+        tmp_filename = f"{cache_filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "wb") as tmp_file:
+            np.save(tmp_file, generate_array(n, seed))
+        os.replace(tmp_filename, cache_filename)
+
+    return np.load(cache_filename, mmap_mode="r")
+
+def create_scratch_buffer(a: list[int] | np.ndarray) -> list[int] | np.ndarray:
+    return list(a) if isinstance(a, list) else np.array(a)
+
+def refill_scratch_buffer(buffer: list[int] | np.ndarray, a: list[int] | np.ndarray) -> None:
+    if isinstance(buffer, list):
+        buffer[:] = a
+    else:
+        np.copyto(buffer, a)
+
+def time_sort(algorithm: SortAlgorithm, a: np.ndarray, iterations: int, scratch: bool = False) -> tuple[list[float], list[float]]:
+    # returns the copy time and the sort time in seconds of every single iteration,
+    # with scratch=True one preallocated buffer is refilled instead of allocating a new copy
+    a = prepare_input(algorithm, a)
+    buffer = create_scratch_buffer(a) if scratch else None
+    copy_times = []
+    sort_times = []
+    for _ in range(iterations):
+        start_copy = time.perf_counter()
+        if scratch:
+            refill_scratch_buffer(buffer, a)
+            b = buffer
+        else:
+            b = create_scratch_buffer(a)
+        start_sort = time.perf_counter()
+        algorithm.sort(b)
+        end_sort = time.perf_counter()
+        copy_times.append(start_sort - start_copy)
+        sort_times.append(end_sort - start_sort)
+
+    return copy_times, sort_times
+
+def run_batch(algorithms: list[SortAlgorithm], sizes: list[int], seeds: list[int], iterations: int,
+              scratch: bool = False, cache_dir: None | str = None) -> list[tuple]:
+    # one row (algorithm, n, seed, iteration, sort time, copy time) per iteration, the arrays are loaded once per (n, seed)
+    rows = []
+    for n in sizes:
+        for seed in seeds:
+            a = load_array(n, seed, cache_dir)
+            for algorithm in algorithms:
+                copy_times, sort_times = time_sort(algorithm, a, iterations, scratch)
+                for iteration, (copy_time, sort_time) in enumerate(zip(copy_times, sort_times)):
+                    rows.append((algorithm.name, n, seed, iteration, sort_time, copy_time))
+
+    return rows
+
+def write_batch_results(filename: str, rows: list[tuple]) -> None:
+    # same style as the results.csv files in measurements/
+    with open(filename, "w", newline="") as results_file:
+        results_file.write("# Algorithm,N,Seed,Iteration,Time,CopyTime\n")
+        csv.writer(results_file).writerows(rows)
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from python_algorithms.insertion_sort import insertion_sort, numpy_insertion_sort
+from python_algorithms.selection_sort import selection_sort, numpy_selection_sort
+from python_algorithms.sample_sort import sample_sort
+
+
+@dataclass(frozen=True)
+class SortAlgorithm:
+    name: str
+    sort: Callable[[list[int] | np.ndarray], None] # sorts in-place
+    as_list: bool = False # the algorithm works on a python list instead of a numpy array
+
+SORT_ALGORITHMS: dict[str, SortAlgorithm] = {}
+
+def register_sort_algorithm(name: str, as_list: bool = False):
+    def decorator(sort_func):
+        if name in SORT_ALGORITHMS:
+            raise ValueError(f"The sort algorithm {name} is already registered.")
+        SORT_ALGORITHMS[name] = SortAlgorithm(name, sort_func, as_list)
+        return sort_func
+
+    return decorator
+
+def get_sort_algorithm(name: str) -> SortAlgorithm:
+    if name not in SORT_ALGORITHMS:
+        raise KeyError(f"Unknown sort algorithm {name}, choose one of: {', '.join(SORT_ALGORITHMS.keys())}.")
+    return SORT_ALGORITHMS[name]
+
+def prepare_input(algorithm: SortAlgorithm, a: np.ndarray) -> list[int] | np.ndarray:
+    return a.tolist() if algorithm.as_list else a
+
+register_sort_algorithm("builtin", as_list=True)(lambda b: b.sort())
+register_sort_algorithm("numpy")(lambda b: b.sort())
+for kind in ["quicksort", "mergesort", "heapsort", "stable"]:
+    register_sort_algorithm(f"numpy_{kind}")(lambda b, kind=kind: b.sort(kind=kind))
+register_sort_algorithm("insertion")(insertion_sort)
+register_sort_algorithm("selection")(selection_sort)
+register_sort_algorithm("numpy_insertion")(numpy_insertion_sort)
+register_sort_algorithm("numpy_selection")(numpy_selection_sort)
+register_sort_algorithm("sample_sort")(sample_sort)
@@ -0,0 +1,53 @@
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+from python_algorithms.sort_registry import get_sort_algorithm
+from python_algorithms.sort_benchmark import load_array, run_batch, time_sort
+
+
+def pin_to_cpu(cpu_queue) -> None:
+    # every worker takes its own cpu, so that runs do not share a core (and its private caches)
+    cpu = cpu_queue.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    else:
+        print(f"[Warning] CPU pinning is not supported on this platform, worker {os.getpid()} is not pinned.")
+
+def run_configuration(configuration: tuple[str, int, int], iterations: int, scratch: bool, cache_dir: None | str) -> list[tuple]:
+    algorithm_name, n, seed = configuration
+    algorithm = get_sort_algorithm(algorithm_name)
+    copy_times, sort_times = time_sort(algorithm, load_array(n, seed, cache_dir), iterations, scratch)
+
+    return [(algorithm_name, n, seed, iteration, sort_time, copy_time)
+            for iteration, (copy_time, sort_time) in enumerate(zip(copy_times, sort_times))]
+
+def run_sweep(algorithm_names: list[str], sizes: list[int], seeds: list[int], iterations: int,
+              scratch: bool = False, cache_dir: None | str = None,
+              workers: int = 1, pin_cpus: bool = False) -> list[tuple]:
+    # workers=1 runs every configuration one after another in this process (needed for isolated energy measurements),
+    # otherwise the independent (algorithm, n, seed) configurations are spread over a process pool
+    if workers <= 1:
+        if pin_cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+        return run_batch([get_sort_algorithm(name) for name in algorithm_names], sizes, seeds, iterations, scratch, cache_dir)
+
+    configurations = [(name, n, seed) for n in sizes for seed in seeds for name in algorithm_names]
+
+    initializer = None
+    initargs = ()
+    if pin_cpus:
+        available_cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+        if workers > len(available_cpus):
+            raise ValueError(f"Cannot pin {workers} workers to {len(available_cpus)} available cpus.")
+        cpu_queue = mp.SimpleQueue()
+        for cpu in available_cpus[:workers]:
+            cpu_queue.put(cpu)
+        initializer = pin_to_cpu
+        initargs = (cpu_queue,)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        futures = [executor.submit(run_configuration, configuration, iterations, scratch, cache_dir)
+                   for configuration in configurations]
+        # the results are collected in the order of the configurations, independent of which worker finished first
+        return [row for future in futures for row in future.result()]
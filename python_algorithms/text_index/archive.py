@@ -0,0 +1,213 @@
+import hashlib
+import lzma
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+import py7zr
+
+ARCHIVE_SUFFIX = ".7z"
+ARCHIVE_CHUNK_SIZE = 1 << 20
+PACKED_READ_SIZE = 1 << 16
+CACHE_DIR = "tmp/archive_cache"
+
+# 7z coder ids that map onto a raw lzma stream
+LZMA2_METHOD = b"\x21"
+LZMA_METHOD = b"\x03\x01\x01"
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    archive: str
+    name: str
+    size: int
+    crc: None | int
+    # byte offset of the packed folder in the archive and of the member inside the unpacked folder
+    packed_offset: int
+    packed_size: int
+    unpacked_offset: int
+    method: bytes
+    properties: bytes
+
+
+def split_archive_path(path: str) -> None | tuple[str, None | str]:
+    # "texts.7z" or "texts.7z:einstein"; None if the path does not point into an archive
+    archive, _, member = path.partition(ARCHIVE_SUFFIX + ":")
+    if member:
+        return archive + ARCHIVE_SUFFIX, member
+    if path.endswith(ARCHIVE_SUFFIX):
+        return path, None
+    return None
+
+
+def archive_members(archive: str) -> dict[str, ArchiveMember]:
+    with py7zr.SevenZipFile(archive) as seven_zip:
+        header = seven_zip.header
+        data_offset = seven_zip.afterheader
+        files = [file for file in seven_zip.files if not file.emptystream]
+
+    streams = header.main_streams
+    folders = streams.unpackinfo.folders
+    substreams = streams.substreamsinfo
+    streams_per_folder = substreams.num_unpackstreams_folders if substreams is not None else [1] * len(folders)
+
+    members = {}
+    file_index = 0
+    pack_index = 0
+    for folder_index, folder in enumerate(folders):
+        coder = folder.coders[0]
+        packed_offset = data_offset + streams.packinfo.packpos + streams.packinfo.packpositions[pack_index]
+        packed_size = streams.packinfo.packsizes[pack_index]
+        method = coder["method"] if len(folder.coders) == 1 and coder["numinstreams"] == 1 else b""
+        pack_index += sum(coder["numinstreams"] for coder in folder.coders)
+
+        unpacked_offset = 0
+        for _ in range(streams_per_folder[folder_index]):
+            file = files[file_index]
+            members[file.filename] = ArchiveMember(archive, file.filename, file.uncompressed, file.crc32, packed_offset, packed_size,
+                                                   unpacked_offset, method, coder.get("properties") or b"")
+            unpacked_offset += file.uncompressed
+            file_index += 1
+
+    return members
+
+
+def get_member(archive: str, name: None | str = None) -> ArchiveMember:
+    members = archive_members(archive)
+    if name is None:
+        if len(members) != 1:
+            raise ValueError(f"{archive} contains {len(members)} files, choose one of {', '.join(members)}")
+        return next(iter(members.values()))
+    if name not in members:
+        raise ValueError(f"{archive} does not contain {name}, choose one of {', '.join(members)}")
+    return members[name]
+
+
+def _lzma_filter(member: ArchiveMember) -> dict:
+    if member.method == LZMA2_METHOD:
+        dict_bits = member.properties[0]
+        return {"id": lzma.FILTER_LZMA2, "dict_size": (2 | (dict_bits & 1)) << (dict_bits // 2 + 11)}
+    if member.method == LZMA_METHOD:
+        lclppb = member.properties[0]
+        return {"id": lzma.FILTER_LZMA1, "lc": lclppb % 9, "lp": lclppb // 9 % 5, "pb": lclppb // 45,
+                "dict_size": int.from_bytes(member.properties[1:5], "little")}
+    raise ValueError(f"{member.archive}:{member.name} is not compressed with LZMA or LZMA2")
+
+
+def _decompress_folder(member: ArchiveMember, chunk_size: int) -> Iterator[bytes]:
+    decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=[_lzma_filter(member)])
+    with open(member.archive, "rb") as archive_file:
+        archive_file.seek(member.packed_offset)
+        remaining = member.packed_size
+        while not decompressor.eof:
+            data = b""
+            if decompressor.needs_input:
+                if remaining == 0:
+                    break
+                data = archive_file.read(min(PACKED_READ_SIZE, remaining))
+                remaining -= len(data)
+            chunk = decompressor.decompress(data, max_length=chunk_size)
+            if chunk:
+                yield chunk
+
+
+def stream_member(member: ArchiveMember, chunk_size: int = ARCHIVE_CHUNK_SIZE, limit: None | int = None) -> Iterator[memoryview]:
+    # decompresses the member chunk by chunk, so at most one chunk (plus the lzma dictionary) is held in memory;
+    # the crc stored in the archive is checked once the whole member has been read
+    size = member.size if limit is None else min(limit, member.size)
+    skip = member.unpacked_offset
+    position = 0
+    crc = 0
+    for chunk in _decompress_folder(member, chunk_size):
+        view = memoryview(chunk)
+        if skip >= len(view):
+            skip -= len(view)
+            continue
+        view = view[skip:skip + size - position]
+        skip = 0
+        crc = zlib.crc32(view, crc)
+        position += len(view)
+        yield view
+        if position == size:
+            break
+
+    if position != size:
+        raise ValueError(f"{member.archive}:{member.name} ended after {position} of {size} bytes")
+    if limit is None and member.crc is not None and crc != member.crc:
+        raise ValueError(f"{member.archive}:{member.name} has a crc mismatch")
+
+
+def content_hash(member: ArchiveMember) -> str:
+    # hash of the packed stream, so a changed archive never hits a stale extraction
+    digest = hashlib.sha256(member.method + member.properties)
+    digest.update(f"{member.unpacked_offset},{member.size}".encode())
+    with open(member.archive, "rb") as archive_file:
+        archive_file.seek(member.packed_offset)
+        remaining = member.packed_size
+        while remaining > 0:
+            data = archive_file.read(min(ARCHIVE_CHUNK_SIZE, remaining))
+            digest.update(data)
+            remaining -= len(data)
+    return digest.hexdigest()[:16]
+
+
+def cached_member(member: ArchiveMember, cache_dir: str = CACHE_DIR, prefix: None | int = None) -> str:
+    # extracts the member (or only its first prefix bytes, into a file of its own) once into cache_dir and returns
+    # the path of the extracted file
+    limit = None if prefix is None or prefix >= member.size else prefix
+    suffix = "" if limit is None else f"_{limit}"
+    filename = os.path.join(cache_dir, f"{os.path.basename(member.name)}_{content_hash(member)}{suffix}")
+    if not os.path.exists(filename):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "wb") as cache_file:
+            for chunk in stream_member(member, limit=limit):
+                cache_file.write(chunk)
+        os.replace(tmp_filename, filename)
+    return filename
+
+
+def read_member(member: ArchiveMember, prefix: None | int = None, cache_dir: None | str = None) -> np.ndarray:
+    # with a cache_dir the extracted file is memory mapped, otherwise the (prefix of the) member is streamed into one array
+    size = member.size if prefix is None else min(prefix, member.size)
+    if cache_dir is not None:
+        return np.memmap(cached_member(member, cache_dir), dtype=np.uint8, mode="r", shape=(size,))
+
+    data = np.empty(size, dtype=np.uint8)
+    position = 0
+    for chunk in stream_member(member, limit=size):
+        data[position:position + len(chunk)] = np.frombuffer(chunk, dtype=np.uint8)
+        position += len(chunk)
+    return data
+
+
+def read_text(path: str, prefix: None | int = None, cache_dir: None | str = None) -> np.ndarray:
+    archive_path = split_archive_path(path)
+    if archive_path is None:
+        return np.fromfile(path, dtype=np.uint8, count=-1 if prefix is None else prefix)
+    return read_member(get_member(*archive_path), prefix, cache_dir)
+
+
+def stream_text(path: str, prefix: None | int = None, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> Iterator[memoryview]:
+    # like read_text, but chunk by chunk for consumers with bounded memory
+    archive_path = split_archive_path(path)
+    if archive_path is not None:
+        yield from stream_member(get_member(*archive_path), chunk_size, prefix)
+        return
+    remaining = os.path.getsize(path) if prefix is None else prefix
+    with open(path, "rb") as text_file:
+        while remaining > 0:
+            chunk = text_file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield memoryview(chunk)
+
+
+if __name__ == "__main__":
+    for archive in ["texts.7z", "patterns.7z"]:
+        for member in archive_members(archive).values():
+            first_chunk = next(stream_member(member, chunk_size=64))
+            print(f"{archive}:{member.name} ({member.size} bytes) starts with {bytes(first_chunk[:32])}")
@@ -0,0 +1,78 @@
+import mmap
+import os
+
+import numpy as np
+
+from python_algorithms.measurement.rapl import EnergySampler
+from python_algorithms.measurement.runner import Run, run_in_process
+from python_algorithms.text_index.archive import CACHE_DIR, cached_member, get_member, read_text, split_archive_path
+from python_algorithms.text_index.fm_index import RunLengthFMIndex
+from python_algorithms.text_index.lz_end import LZEndParser
+from python_algorithms.text_index.rlz import RLZArchive
+from python_algorithms.text_index.suffix_array import SuffixArrayIndex
+
+INTERVAL_LENGTH = 1000
+BATCH_SIZE = 1000
+EXTRACTORS = ["mmap", "sa", "fm", "rlz", "lzend"]
+
+def generate_intervals(n: int, count: int, min_length: int = INTERVAL_LENGTH, max_length: int = INTERVAL_LENGTH,
+                       seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    # count random intervals [begin, end) of the text with a length drawn uniformly from [min_length, max_length]
+    rng = np.random.default_rng(seed)
+    lengths = np.minimum(rng.integers(min_length, max_length + 1, size=count), n)
+    begins = rng.integers(0, n - lengths + 1)
+    return begins, begins + lengths
+
+class MmapText:
+    # the baseline without any index: the plain text file memory mapped, every interval is one slice. With a prefix
+    # only the first prefix bytes are visible (and counted by size_in_bytes), so it covers the same text as the indices
+
+    def __init__(self, filename: str, prefix: None | int = None):
+        with open(filename, "rb") as text_file:
+            self.mapping = mmap.mmap(text_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.length = len(self.mapping) if prefix is None else min(prefix, len(self.mapping))
+        self.text = memoryview(self.mapping)[:self.length]
+
+    def extract(self, begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(begins) + 1, dtype=np.int64)
+        np.cumsum(np.maximum(np.asarray(ends) - np.asarray(begins), 0), out=offsets[1:])
+        data = b"".join(self.text[begin:end] for begin, end in zip(begins.tolist(), ends.tolist()))
+        return offsets, np.frombuffer(data, dtype=np.uint8)
+
+    def size_in_bytes(self) -> int:
+        return self.length
+
+def text_filename(path: str, cache_dir: None | str = None, prefix: None | int = None) -> str:
+    # a file that can be memory mapped, archive members (or only their prefix) are extracted into the cache once
+    archive_path = split_archive_path(path)
+    if archive_path is None:
+        return path
+    return cached_member(get_member(*archive_path), CACHE_DIR if cache_dir is None else cache_dir, prefix)
+
+def text_length(path: str, prefix: None | int = None) -> int:
+    archive_path = split_archive_path(path)
+    size = os.path.getsize(path) if archive_path is None else get_member(*archive_path).size
+    return size if prefix is None else min(prefix, size)
+
+def build_extractor(kind: str, path: str, prefix: None | int = None, cache_dir: None | str = None, sample_rate: int = 32):
+    # every extractor has extract(begins, ends) -> (offsets, data) and size_in_bytes()
+    if kind == "mmap":
+        return MmapText(text_filename(path, cache_dir, prefix), prefix)
+    text = read_text(path, prefix, cache_dir)
+    if kind == "sa":
+        return SuffixArrayIndex(text)
+    if kind == "fm":
+        return RunLengthFMIndex(text, sample_rate=sample_rate)
+    if kind == "rlz":
+        return RLZArchive(text)
+    if kind == "lzend":
+        return LZEndParser().parse(text)
+    raise ValueError(f"unknown extractor {kind}, expected one of {', '.join(EXTRACTORS)}")
+
+def benchmark_extraction(extractor, begins: np.ndarray, ends: np.ndarray, sampler: None | EnergySampler, runs: int,
+                         batch_size: int = BATCH_SIZE) -> list[Run]:
+    # one Run (a row of results.csv) per extraction of all intervals in batches of batch_size
+    def extract_all() -> None:
+        for batch_start in range(0, len(begins), batch_size):
+            extractor.extract(begins[batch_start:batch_start + batch_size], ends[batch_start:batch_start + batch_size])
+    return [run_in_process(extract_all, sampler) for _ in range(runs)]
@@ -0,0 +1,200 @@
+import time
+from functools import cached_property
+from typing import Iterator
+
+import numpy as np
+
+from python_algorithms.text_index.suffix_array import QueryStatistics, build_suffix_array
+
+SENTINEL = 256 # the end of the text marker in the bwt, smaller than every byte
+SIGMA = 257
+
+class RunLengthFMIndex:
+    # FM-index over the run-length encoded BWT of text + sentinel, i.e. its size depends on the number r of runs:
+    # - run_starts/run_chars: start position and character of every run (run_starts[k] is the select of the
+    #   k-th run head, a binary search on it is the rank of the run heads)
+    # - char_run_keys/char_offsets: the runs ordered by (character, run), so the runs of one character before
+    #   run j are counted with one binary search
+    # - char_run_lengths: exclusive prefix sums of the run lengths in the (character, run) order
+    # - sampled_rows/sampled_values: every sample_rate-th text position of the suffix array for locate
+
+    def __init__(self, text: np.ndarray, sa: None | np.ndarray = None, sample_rate: int = 32):
+        sa = build_suffix_array(text) if sa is None else sa
+        n = len(text)
+        self.n = n + 1 # number of rows, including the sentinel suffix
+        self.sample_rate = sample_rate
+        self.statistics = QueryStatistics()
+
+        # row 0 is the sentinel suffix, the other rows are the suffixes in the order of sa
+        rows_sa = np.empty(self.n, dtype=np.int64)
+        rows_sa[0] = n
+        rows_sa[1:] = sa
+        bwt = np.empty(self.n, dtype=np.uint16)
+        bwt[rows_sa > 0] = text[rows_sa[rows_sa > 0] - 1]
+        bwt[rows_sa == 0] = SENTINEL
+
+        self.C = np.zeros(SIGMA + 1, dtype=np.int64)
+        self.C[1:SENTINEL + 1] = 1 + np.cumsum(np.bincount(text, minlength=SENTINEL)) # +1 for the sentinel row
+        self.C[0] = 1
+
+        run_heads = np.flatnonzero(np.concatenate(([True], bwt[1:] != bwt[:-1])))
+        index_dtype = np.int32 if self.n < 2**31 else np.int64
+        self.run_starts = run_heads.astype(index_dtype)
+        self.run_chars = bwt[run_heads]
+        run_lengths = np.diff(np.append(run_heads, self.n))
+        self.r = len(run_heads)
+
+        keys = self.run_chars.astype(np.int64) * self.r + np.arange(self.r)
+        order = np.argsort(keys)
+        self.char_run_keys = keys[order]
+        self.char_offsets = np.searchsorted(self.char_run_keys, np.arange(SIGMA + 1, dtype=np.int64) * self.r)
+        self.char_run_lengths = np.zeros(self.r + 1, dtype=np.int64)
+        np.cumsum(run_lengths[order], out=self.char_run_lengths[1:])
+
+        sampled = np.flatnonzero(rows_sa % sample_rate == 0)
+        self.sampled_rows = sampled.astype(index_dtype)
+        self.sampled_values = rows_sa[sampled].astype(index_dtype)
+
+    ARRAYS = ["C", "run_starts", "run_chars", "char_run_keys", "char_offsets", "char_run_lengths", "sampled_rows", "sampled_values"]
+
+    def index_attributes(self) -> dict:
+        return {"n": self.n, "r": self.r, "sample_rate": self.sample_rate}
+
+    def index_arrays(self) -> dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], attributes: dict) -> "RunLengthFMIndex":
+        index = cls.__new__(cls)
+        index.n = attributes["n"]
+        index.r = attributes["r"]
+        index.sample_rate = attributes["sample_rate"]
+        index.statistics = QueryStatistics()
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    def size_in_bytes(self) -> int:
+        return sum(array.nbytes for array in self.index_arrays().values())
+
+    def _rank_cost(self, ranks: int) -> None:
+        # every rank does two binary searches over r entries and a constant number of further accesses
+        search_steps = int(np.ceil(np.log2(self.r + 1)))
+        self.statistics.bytes_touched += ranks * (search_steps * (self.run_starts.itemsize + self.char_run_keys.itemsize)
+                                                  + 2 * self.char_run_lengths.itemsize + self.run_chars.itemsize)
+        self.statistics.cache_lines_touched += ranks * (2 * search_steps + 3)
+
+    def _sample_search_cost(self, searches: int, found: int) -> None:
+        # every search is a binary search over the sampled rows, every found row reads its sampled value
+        search_steps = int(np.ceil(np.log2(len(self.sampled_rows) + 1)))
+        self.statistics.bytes_touched += searches * search_steps * self.sampled_rows.itemsize + found * self.sampled_values.itemsize
+        self.statistics.cache_lines_touched += searches * search_steps + found
+
+    def rank(self, c: np.ndarray, i: np.ndarray) -> np.ndarray:
+        # number of occurrences of c[k] in bwt[0:i[k]] for all k at once
+        j = np.maximum(np.searchsorted(self.run_starts, i, side="left") - 1, 0) # the run that contains i - 1
+        full_runs = np.searchsorted(self.char_run_keys, c * self.r + j, side="left")
+        full = self.char_run_lengths[full_runs] - self.char_run_lengths[self.char_offsets[c]]
+
+        partial = np.where((i > 0) & (self.run_chars[j] == c), i - self.run_starts[j], 0)
+        self._rank_cost(len(i))
+        return full + partial
+
+    def access(self, rows: np.ndarray) -> np.ndarray:
+        return self.run_chars[np.searchsorted(self.run_starts, rows, side="right") - 1]
+
+    def lf(self, rows: np.ndarray) -> np.ndarray:
+        c = self.access(rows).astype(np.int64)
+        return self.C[c] + self.rank(c, rows)
+
+    def ranges(self, patterns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # backward search of all patterns at once, every step is one rank for the whole batch
+        begin = np.zeros(len(patterns), dtype=np.int64)
+        end = np.full(len(patterns), self.n, dtype=np.int64)
+        for j in range(patterns.shape[1] - 1, -1, -1):
+            c = patterns[:, j].astype(np.int64)
+            begin = self.C[c] + self.rank(c, begin)
+            end = self.C[c] + self.rank(c, end)
+        self.statistics.search_steps += len(patterns) * patterns.shape[1]
+        return begin, np.maximum(begin, end)
+
+    def count(self, patterns: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        begin, end = self.ranges(patterns)
+        self.statistics.time_count += time.perf_counter() - start
+        self.statistics.queries += len(patterns)
+        return end - begin
+
+    def resolve(self, rows: np.ndarray) -> np.ndarray:
+        # the text positions of the rows: walks LF for all rows at once until each one reaches a sampled row; the
+        # LF steps of all rows are search steps, their rank and sampled row searches are counted as touched memory
+        positions = np.empty(len(rows), dtype=np.int64)
+        steps = 0
+        lf_steps = 0
+        pending = np.arange(len(rows))
+        rows = rows.astype(np.int64)
+        while len(pending) > 0:
+            sample = np.minimum(np.searchsorted(self.sampled_rows, rows), len(self.sampled_rows) - 1)
+            found = self.sampled_rows[sample] == rows
+            positions[pending[found]] = self.sampled_values[sample[found]] + steps
+            self._sample_search_cost(len(pending), int(np.count_nonzero(found)))
+            pending = pending[~found]
+            rows = self.lf(rows[~found])
+            lf_steps += len(pending)
+            steps += 1
+        self.statistics.search_steps += lf_steps
+        return positions
+
+    @cached_property
+    def sampled_position_rows(self) -> np.ndarray:
+        # the rows of the sampled text positions 0, sample_rate, 2 * sample_rate, ...
+        return self.sampled_rows[np.argsort(self.sampled_values)]
+
+    def extract(self, begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the intervals text[begin:end] as (offsets, data) like SuffixArrayIndex.extract: every interval walks LF
+        # backwards from the first sampled text position at or after its end (or the end of the text), the bwt
+        # character of a row is the text character before its suffix; all intervals take one step at once
+        start = time.perf_counter()
+        begins = np.asarray(begins, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        lengths = np.maximum(ends - begins, 0)
+        offsets = np.zeros(len(begins) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        data = np.empty(offsets[-1], dtype=np.uint8)
+
+        text_length = self.n - 1
+        pending = np.flatnonzero(lengths > 0)
+        positions = np.minimum(-(-ends[pending] // self.sample_rate) * self.sample_rate, text_length)
+        sample = np.minimum(positions // self.sample_rate, len(self.sampled_position_rows) - 1)
+        rows = np.where(positions == text_length, 0, self.sampled_position_rows[sample]).astype(np.int64)
+        steps = 0
+        while len(pending) > 0:
+            c = self.access(rows).astype(np.int64)
+            positions -= 1
+            inside = positions < ends[pending]
+            data[offsets[pending[inside]] + positions[inside] - begins[pending[inside]]] = c[inside]
+            rows = self.C[c] + self.rank(c, rows)
+            steps += len(pending)
+
+            remaining = positions > begins[pending]
+            pending, positions, rows = pending[remaining], positions[remaining], rows[remaining]
+
+        self.statistics.time_extract += time.perf_counter() - start
+        self.statistics.queries += len(begins)
+        self.statistics.search_steps += steps
+        return offsets, data
+
+    def locate(self, patterns: np.ndarray, batch_size: int = 1000) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        # same interface as SuffixArrayIndex.locate
+        for batch_start in range(0, len(patterns), batch_size):
+            start = time.perf_counter()
+            begin, end = self.ranges(patterns[batch_start:batch_start + batch_size])
+            counts = end - begin
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            occurrences = self.resolve(np.repeat(begin - offsets[:-1], counts) + np.arange(offsets[-1]))
+            self.statistics.time_locate += time.perf_counter() - start
+
+            self.statistics.queries += len(counts)
+            self.statistics.occurrences += int(offsets[-1])
+            yield offsets, occurrences
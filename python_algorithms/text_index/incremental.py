@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_algorithms.text_index.suffix_array import SuffixArrayIndex, build_suffix_array
+
+RANK_SAMPLE_RATE = 4096
+SIGMA = 256
+
+# Appending A to a text T keeps the relative order of all suffixes T[i:] + A with i < n - L, where L is the length
+# of the longest suffix of T that also occurs elsewhere in T: two such suffixes of T already differ before the end of T.
+# Only the suffixes starting in the tail U = (T + A)[n - L:] are sorted (by build_suffix_array on U) and then
+# merged into the kept order. The number of kept suffixes smaller than a tail suffix follows from the one of the next
+# tail suffix with one rank query on the characters before the kept suffixes, like a backward search step.
+
+@dataclass
+class MergeStatistics:
+    n: int = 0 # length of the text before the append
+    appended: int = 0
+    tail: int = 0 # suffixes that were sorted again, the appended ones and the L repeated ones before them
+    time_repeat: float = 0.0
+    time_sort: float = 0.0
+    time_rank: float = 0.0
+    time_merge: float = 0.0
+
+    def total_time(self) -> float:
+        return self.time_repeat + self.time_sort + self.time_rank + self.time_merge
+
+def repeated_suffix_length(index: SuffixArrayIndex) -> int:
+    # the largest L such that the last L characters of the text occur at least twice, found by exponential and binary
+    # search with count since every suffix of a repeated suffix is repeated as well
+    text = index.text
+    n = len(text)
+    repeated = lambda length: length == 0 or int(index.count(np.asarray(text[n - length:])[None, :])[0]) >= 2
+    lo, hi = 0, 1
+    while hi < n and repeated(hi):
+        lo, hi = hi, min(2 * hi, n)
+    # repeated(lo) holds and repeated(hi) does not (the whole text occurs once)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        lo, hi = (mid, hi) if repeated(mid) else (lo, mid)
+    return lo
+
+class _KeptRanks:
+    # rank over the characters before the kept suffixes in their suffix array order
+
+    def __init__(self, text: np.ndarray, kept_sa: np.ndarray):
+        before = text[np.maximum(kept_sa - 1, 0)]
+        # the first suffix has no character before it, it is stored as a 0 byte and not counted
+        self.first_row = int(np.flatnonzero(kept_sa == 0)[0])
+        before[self.first_row] = 0
+        self.before = before.tobytes()
+        blocks = (len(before) + RANK_SAMPLE_RATE - 1) // RANK_SAMPLE_RATE
+        block_counts = np.bincount(np.arange(len(before)) // RANK_SAMPLE_RATE * SIGMA + before, minlength=blocks * SIGMA).reshape(blocks, SIGMA)
+        self.rank_samples = np.zeros((blocks + 1, SIGMA), dtype=np.int64)
+        np.cumsum(block_counts, axis=0, out=self.rank_samples[1:])
+
+    def rank(self, c: int, i: int) -> int:
+        block = i // RANK_SAMPLE_RATE
+        count = self.rank_samples.item(block, c) + self.before.count(c, block * RANK_SAMPLE_RATE, i)
+        if c == 0 and self.first_row < i:
+            count -= 1
+        return count
+
+def merge_appended(index: SuffixArrayIndex, appended: np.ndarray) -> tuple[np.ndarray, np.ndarray, MergeStatistics]:
+    # the text and suffix array of index.text + appended, see the comment at the top
+    text = np.asarray(index.text)
+    appended = np.asarray(appended, dtype=np.uint8)
+    n = len(text)
+    statistics = MergeStatistics(n=n, appended=len(appended))
+    if n == 0 or len(appended) == 0:
+        new_text = np.concatenate([text, appended])
+        return new_text, build_suffix_array(new_text), statistics
+
+    start = time.perf_counter()
+    tail_start = n - repeated_suffix_length(SuffixArrayIndex(text, index.sa))
+    statistics.time_repeat = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_text = np.concatenate([text, appended])
+    tail_sa = build_suffix_array(new_text[tail_start:]).astype(np.int64)
+    tail_ranks = np.empty(len(tail_sa), dtype=np.int64)
+    tail_ranks[tail_sa] = np.arange(len(tail_sa))
+    sa = np.asarray(index.sa)
+    kept_sa = sa[sa < tail_start]
+    statistics.tail = len(tail_sa)
+    statistics.time_sort = time.perf_counter() - start
+
+    # smaller[q - tail_start] is the number of kept suffixes smaller than the suffix at q, from right to left
+    start = time.perf_counter()
+    ranks = _KeptRanks(new_text, kept_sa)
+    C = np.concatenate([[0], np.cumsum(np.bincount(new_text[:tail_start], minlength=SIGMA))]).tolist()
+    data = new_text.tobytes()
+    last_kept_char = data[tail_start - 1]
+    first_tail_rank = int(tail_ranks[0])
+    tail_ranks_list = tail_ranks.tolist()
+    smaller = [0] * len(tail_sa)
+    next_smaller, next_rank = 0, -1 # the empty suffix after the text: no kept suffix is smaller, every tail suffix is larger
+    for q in range(len(new_text) - 1, tail_start - 1, -1):
+        c = data[q]
+        # kept suffixes c + X with X < the next suffix; X is kept, or X is the tail start after the last kept suffix
+        next_smaller = C[c] + ranks.rank(c, next_smaller) + (c == last_kept_char and first_tail_rank < next_rank)
+        smaller[q - tail_start] = next_smaller
+        next_rank = tail_ranks_list[q - tail_start]
+    statistics.time_rank = time.perf_counter() - start
+
+    # smaller is monotonic in the tail order, so the tail suffixes are inserted at smaller + their tail rank
+    start = time.perf_counter()
+    tail_rows = np.asarray(smaller, dtype=np.int64)[tail_sa] + np.arange(len(tail_sa))
+    new_sa = np.empty(len(new_text), dtype=np.int32 if len(new_text) < 2**31 else np.int64)
+    is_tail = np.zeros(len(new_text), dtype=bool)
+    is_tail[tail_rows] = True
+    new_sa[tail_rows] = tail_start + tail_sa
+    new_sa[~is_tail] = kept_sa
+    statistics.time_merge = time.perf_counter() - start
+    return new_text, new_sa, statistics
+
+def append_text(index: SuffixArrayIndex, appended: np.ndarray) -> tuple[SuffixArrayIndex, MergeStatistics]:
+    text, sa, statistics = merge_appended(index, appended)
+    return SuffixArrayIndex(text, sa), statistics
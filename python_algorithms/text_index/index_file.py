@@ -0,0 +1,120 @@
+import ctypes
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from python_algorithms.text_index.suffix_array import SuffixArrayIndex
+from python_algorithms.text_index.fm_index import RunLengthFMIndex
+
+# layout of an index file (all integers little endian):
+#   magic (8 bytes) | version (uint32) | length of the json section table (uint32) | json section table
+#   | padding | section 0 | padding | section 1 | ...
+# every section is one array that starts at a multiple of SECTION_ALIGNMENT, so it can be mapped without a copy
+# and only the pages that a query touches are read from disk
+MAGIC = b"ECCINDEX"
+VERSION = 1
+SECTION_ALIGNMENT = 4096
+_PREAMBLE = struct.Struct("<8sII")
+
+INDEX_KINDS = {
+    "sa": SuffixArrayIndex,
+    "fm": RunLengthFMIndex,
+}
+
+def _align(offset: int) -> int:
+    return (offset + SECTION_ALIGNMENT - 1) // SECTION_ALIGNMENT * SECTION_ALIGNMENT
+
+def write_index_file(filename: str, kind: str, attributes: dict, arrays: dict[str, np.ndarray]) -> None:
+    sections = [{"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": 0, "nbytes": array.nbytes}
+                for name, array in arrays.items()]
+    table = {"kind": kind, "attributes": attributes, "sections": sections}
+    # the offsets are not known yet, every placeholder 0 is later replaced by at most 20 digits
+    offset = _align(_PREAMBLE.size + len(json.dumps(table).encode()) + 20 * len(sections))
+    for section in sections:
+        section["offset"] = offset
+        offset = _align(offset + section["nbytes"])
+    table_bytes = json.dumps(table).encode()
+
+    with open(filename, "wb") as index_file:
+        index_file.write(_PREAMBLE.pack(MAGIC, VERSION, len(table_bytes)))
+        index_file.write(table_bytes)
+        for section, array in zip(sections, arrays.values()):
+            index_file.seek(section["offset"])
+            index_file.write(np.ascontiguousarray(array).tobytes())
+        index_file.truncate(offset)
+
+def is_index_file(filename: str) -> bool:
+    if not os.path.isfile(filename):
+        return False
+    with open(filename, "rb") as index_file:
+        return index_file.read(len(MAGIC)) == MAGIC
+
+class IndexFile:
+    # a memory mapped index file, the arrays are views into the mapping and are only paged in on access
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as index_file:
+            self.total_bytes = os.fstat(index_file.fileno()).st_size
+            self._mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, table_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not an index file.")
+        if version != VERSION:
+            raise ValueError(f"{filename} has version {version}, but only version {VERSION} is supported.")
+
+        table = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + table_length])
+        self.kind: str = table["kind"]
+        self.attributes: dict = table["attributes"]
+        self.sections: list[dict] = table["sections"]
+        self.arrays: dict[str, np.ndarray] = {
+            section["name"]: np.frombuffer(self._mmap, dtype=np.dtype(section["dtype"]), count=int(np.prod(section["shape"])),
+                                           offset=section["offset"]).reshape(section["shape"])
+            for section in self.sections
+        }
+
+    def resident_pages(self) -> None | np.ndarray:
+        # one flag per page of the file that is in memory, None if mincore is not available
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+        except OSError:
+            return None
+        if not hasattr(libc, "mincore"):
+            return None
+
+        page_size = mmap.PAGESIZE
+        pages = (self.total_bytes + page_size - 1) // page_size
+        flags = (ctypes.c_ubyte * pages)()
+        address = np.frombuffer(self._mmap, dtype=np.uint8).ctypes.data
+        if libc.mincore(ctypes.c_void_p(address), ctypes.c_size_t(self.total_bytes), flags) != 0:
+            return None
+        return np.frombuffer(flags, dtype=np.uint8) & 1 == 1
+
+    def residency(self) -> dict[str, tuple[None | int, int]]:
+        # resident and total bytes of every section
+        resident_pages = self.resident_pages()
+        residency = {}
+        for section in self.sections:
+            first_page = section["offset"] // mmap.PAGESIZE
+            last_page = (section["offset"] + section["nbytes"] + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+            resident = None if resident_pages is None else \
+                min(int(resident_pages[first_page:last_page].sum()) * mmap.PAGESIZE, section["nbytes"])
+            residency[section["name"]] = (resident, section["nbytes"])
+        return residency
+
+    def close(self) -> None:
+        self.arrays = {}
+        self._mmap.close()
+
+def save_index(index: SuffixArrayIndex | RunLengthFMIndex, filename: str) -> None:
+    kind = next(kind for kind, index_class in INDEX_KINDS.items() if isinstance(index, index_class))
+    write_index_file(filename, kind, index.index_attributes(), index.index_arrays())
+
+def load_index(filename: str) -> tuple[SuffixArrayIndex | RunLengthFMIndex, IndexFile]:
+    # the index works directly on the mapped arrays, the IndexFile must stay open while the index is used
+    index_file = IndexFile(filename)
+    return INDEX_KINDS[index_file.kind].from_arrays(index_file.arrays, index_file.attributes), index_file
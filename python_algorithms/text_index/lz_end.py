@@ -0,0 +1,307 @@
+import array
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy as np
+
+from python_algorithms.text_index.suffix_array import build_suffix_array
+
+# sources of a phrase must end in the current or the previous window, so at most two windows are indexed at once
+WINDOW_SIZE = 1 << 20
+RANK_SAMPLE_RATE = 256
+SIGMA = 256
+PHASES = ["read", "index", "mark", "parse", "encode"]
+
+class ReversedWindowIndex:
+    # FM-index of the reversed window, the text text[e - l:e] that ends at e is the prefix of the reversed suffix
+    # starting at len(window) - e, so extending a phrase by one character is one backward search step
+
+    def __init__(self, window: np.ndarray):
+        reversed_window = np.ascontiguousarray(window[::-1])
+        n = len(reversed_window)
+        # the empty suffix (the sentinel) is the first row
+        sa = np.concatenate([[n], build_suffix_array(reversed_window)]).astype(np.int64)
+        self.rows = np.empty(n + 1, dtype=np.int64)
+        self.rows[sa] = np.arange(n + 1)
+        self.sentinel_row = int(self.rows[0])
+        self.sa = array.array("q", sa.tobytes())
+
+        # sparse table of the maxima of RANK_SAMPLE_RATE rows blocks of the suffix array for max_suffix
+        padded = np.full(-(-(n + 1) // RANK_SAMPLE_RATE) * RANK_SAMPLE_RATE, -1, dtype=np.int64)
+        padded[:n + 1] = sa
+        level = padded.reshape(-1, RANK_SAMPLE_RATE).max(axis=1)
+        self.block_maxima = [level.tolist()]
+        width = 1
+        while 2 * width <= len(level):
+            level = np.maximum(level[:-width], level[width:])
+            self.block_maxima.append(level.tolist())
+            width *= 2
+
+        bwt = reversed_window[np.maximum(sa - 1, 0)]
+        bwt[self.sentinel_row] = 0
+        self.bwt = bwt.tobytes()
+        self.C = np.concatenate([[1], 1 + np.cumsum(np.bincount(reversed_window, minlength=SIGMA))]).tolist()
+
+        blocks = (n + 1 + RANK_SAMPLE_RATE - 1) // RANK_SAMPLE_RATE
+        block_counts = np.bincount(np.arange(n + 1) // RANK_SAMPLE_RATE * SIGMA + bwt, minlength=blocks * SIGMA).reshape(blocks, SIGMA)
+        self.rank_samples = np.zeros((blocks + 1, SIGMA), dtype=np.int64)
+        np.cumsum(block_counts, axis=0, out=self.rank_samples[1:])
+
+    def rank(self, c: int, i: int) -> int:
+        # occurrences of c in bwt[:i]; the sentinel is stored as a 0 byte and not counted
+        block = i // RANK_SAMPLE_RATE
+        count = self.rank_samples.item(block, c) + self.bwt.count(c, block * RANK_SAMPLE_RATE, i)
+        if c == 0 and self.sentinel_row < i:
+            count -= 1
+        return count
+
+    def max_suffix(self, lo: int, hi: int) -> int:
+        # the largest suffix array value in rows [lo, hi), i.e. the leftmost text occurrence of the reversed pattern
+        first_block = -(-lo // RANK_SAMPLE_RATE)
+        last_block = hi // RANK_SAMPLE_RATE
+        if first_block >= last_block:
+            return max(self.sa[lo:hi])
+        level = (last_block - first_block).bit_length() - 1
+        maxima = self.block_maxima[level]
+        result = max(maxima[first_block], maxima[last_block - (1 << level)])
+        if lo < first_block * RANK_SAMPLE_RATE:
+            result = max(result, max(self.sa[lo:first_block * RANK_SAMPLE_RATE]))
+        if last_block * RANK_SAMPLE_RATE < hi:
+            result = max(result, max(self.sa[last_block * RANK_SAMPLE_RATE:hi]))
+        return result
+
+    def row_of_end(self, end: int) -> int:
+        # the row of the reversed suffix that starts with the text ending at end (window coordinates)
+        return int(self.rows[len(self.bwt) - 1 - end])
+
+@dataclass
+class ConstructionStatistics:
+    n: int = 0
+    phrases: int = 0
+    windows: int = 0
+    backward_steps: int = 0
+    phase_times: dict[str, float] = field(default_factory=lambda: {phase: 0.0 for phase in PHASES})
+    # peak resident set size of the process during every phase in bytes, see _Phase
+    phase_peaks: dict[str, int] = field(default_factory=lambda: {phase: 0 for phase in PHASES})
+
+def peak_rss() -> int:
+    # VmHWM of the process in bytes, 0 if /proc is not available
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def reset_peak_rss() -> None:
+    # writing 5 to clear_refs resets VmHWM to the current resident set size (Linux >= 4.0); without it the
+    # phase peaks are the peaks since the start of the process
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+class _Phase:
+    # tracemalloc would slow down the parse loop by an order of magnitude, the resident set size costs nothing
+
+    def __init__(self, statistics: ConstructionStatistics, phase: str):
+        self.statistics = statistics
+        self.phase = phase
+
+    def __enter__(self):
+        reset_peak_rss()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.statistics.phase_times[self.phase] += time.perf_counter() - self.start
+        self.statistics.phase_peaks[self.phase] = max(self.statistics.phase_peaks[self.phase], peak_rss())
+
+class LZEndParser:
+    # greedy LZ-End: every phrase is the longest prefix of the remaining text that ends at the end of a previous phrase
+    # (its source), followed by one explicit character
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.window_size = window_size
+        self.statistics = ConstructionStatistics()
+        self.sources = [] # source phrase, -1 for phrases without a copy
+        self.lengths = [] # length of the copy, the phrase has one more character
+        self.chars = []
+        self.ends = [] # text position after the last character of every phrase
+
+    def _phase(self, phase: str) -> _Phase:
+        return _Phase(self.statistics, phase)
+
+    def _parse_window(self, span: np.ndarray, span_start: int, window_start: int) -> None:
+        with self._phase("index"):
+            index = ReversedWindowIndex(span)
+
+        with self._phase("mark"):
+            # the ends of the phrases of the previous window are sources for this window
+            first = bisect.bisect_right(self.ends, span_start)
+            marked = sorted((index.row_of_end(self.ends[phrase] - span_start), phrase) for phrase in range(first, len(self.ends)))
+            marked_rows = [row for row, _ in marked]
+            marked_phrases = [phrase for _, phrase in marked]
+
+        with self._phase("parse"):
+            text = span.tobytes()
+            limit = len(text)
+            C = index.C
+            rank = index.rank
+            max_suffix = index.max_suffix
+            position = window_start - span_start
+            steps = 0
+            while position < limit:
+                # an occurrence ends at or before position iff its reversed suffix starts at or after limit - position
+                earliest = limit - position
+                lo, hi = 0, limit + 1
+                best_length, best_phrase = 0, -1
+                length = 0
+                # the copy may extend to limit - 1, the last character of a phrase is explicit
+                while position + length < limit - 1:
+                    c = text[position + length]
+                    lo = C[c] + rank(c, lo)
+                    hi = C[c] + rank(c, hi)
+                    steps += 1
+                    # the window also contains the remaining text, the copy needs an occurrence before position
+                    if max_suffix(lo, hi) < earliest:
+                        break
+                    length += 1
+                    k = bisect.bisect_left(marked_rows, lo)
+                    if k < len(marked_rows) and marked_rows[k] < hi:
+                        best_length, best_phrase = length, marked_phrases[k]
+
+                position += best_length + 1
+                self.sources.append(best_phrase)
+                self.lengths.append(best_length)
+                self.chars.append(text[position - 1])
+                self.ends.append(span_start + position)
+                k = bisect.bisect_left(marked_rows, row := index.row_of_end(position))
+                marked_rows.insert(k, row)
+                marked_phrases.insert(k, len(self.ends) - 1)
+            self.statistics.backward_steps += steps
+        self.statistics.windows += 1
+
+    def parse_stream(self, chunks: Iterable[memoryview]) -> "LZEndArchive":
+        # consumes the text chunk by chunk (e.g. archive.stream_member), only the previous and the current window are kept
+        chunks = iter(chunks)
+        previous = np.empty(0, dtype=np.uint8)
+        window_start = 0
+        while True:
+            with self._phase("read"):
+                buffer = bytearray()
+                for chunk in chunks:
+                    buffer += chunk
+                    if len(buffer) >= self.window_size:
+                        break
+                # a chunk may overshoot the window, the rest is kept for the next window
+                window = np.frombuffer(bytes(buffer[:self.window_size]), dtype=np.uint8)
+                rest = buffer[self.window_size:]
+                if rest:
+                    chunks = _prepend(memoryview(bytes(rest)), chunks)
+            if len(window) == 0:
+                break
+            span = np.concatenate([previous, window])
+            self._parse_window(span, window_start - len(previous), window_start)
+            previous = window
+            window_start += len(window)
+
+        with self._phase("encode"):
+            archive = LZEndArchive(np.array(self.sources, dtype=np.int64), np.array(self.lengths, dtype=np.int64),
+                                   np.array(self.chars, dtype=np.uint8))
+        self.statistics.n = window_start
+        self.statistics.phrases = len(self.ends)
+        archive.statistics = self.statistics
+        return archive
+
+    def parse(self, text: np.ndarray) -> "LZEndArchive":
+        text = np.asarray(text, dtype=np.uint8)
+        return self.parse_stream(memoryview(text[start:start + self.window_size]) for start in range(0, len(text), self.window_size))
+
+def _prepend(first: memoryview, chunks):
+    yield first
+    yield from chunks
+
+class LZEndArchive:
+    # phrase i is text[end(source[i]) - length[i]:end(source[i])] + char[i]; the arrays use the smallest dtype that fits
+
+    def __init__(self, sources: np.ndarray, lengths: np.ndarray, chars: np.ndarray):
+        self.sources = sources.astype(np.min_scalar_type(-max(1, len(sources))))
+        self.lengths = lengths.astype(np.min_scalar_type(max(1, int(lengths.max(initial=1)))))
+        self.chars = chars
+        self.ends = np.cumsum(self.lengths.astype(np.int64) + 1)
+        self.statistics = ConstructionStatistics()
+        self.time_extract = 0.0
+        self.extracted_bytes = 0
+
+    def __len__(self) -> int:
+        return int(self.ends[-1]) if len(self.ends) > 0 else 0
+
+    def size_in_bytes(self) -> int:
+        # the stored arrays, the phrase ends are recomputed from the lengths
+        return self.sources.nbytes + self.lengths.nbytes + self.chars.nbytes
+
+    def compression_ratio(self) -> float:
+        return len(self) / self.size_in_bytes()
+
+    def extraction_throughput(self) -> float:
+        return self.extracted_bytes / self.time_extract if self.time_extract > 0 else 0.0
+
+    def extract(self, begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the intervals text[begin:end] of all rows as (offsets, data) like RLZArchive.extract. The k characters
+        # ending at the end of phrase q are extract(q - 1, k - 1 - length[q]) + extract(source[q], length[q]) + char[q],
+        # all pending (phrase, k, output end) tasks are expanded together, one character per task and round
+        start = time.perf_counter()
+        begins = np.asarray(begins, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        lengths = np.maximum(ends - begins, 0)
+        offsets = np.zeros(len(begins) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # every interval is extracted up to the end of the phrase that contains its last character, the surplus
+        # characters are written behind the interval into a scratch area and dropped
+        nonempty = np.flatnonzero(lengths > 0)
+        phrases = np.searchsorted(self.ends, ends[nonempty] - 1, side="right")
+        surplus = self.ends[phrases] - ends[nonempty]
+        scratch_offsets = np.zeros(len(nonempty) + 1, dtype=np.int64)
+        np.cumsum(surplus, out=scratch_offsets[1:])
+        output = np.empty(offsets[-1] + scratch_offsets[-1], dtype=np.uint8)
+
+        # the output positions of the surplus are mapped into the scratch area by shifting them behind offsets[-1]
+        task_phrases = phrases
+        task_counts = lengths[nonempty] + surplus
+        task_ends = offsets[nonempty + 1] + surplus # virtual end of the extended interval
+        task_shift = offsets[-1] + scratch_offsets[:-1] - offsets[nonempty + 1] # for virtual positions >= the interval end
+        task_limits = offsets[nonempty + 1]
+
+        sources = self.sources.astype(np.int64)
+        copy_lengths = self.lengths.astype(np.int64)
+        while len(task_phrases) > 0:
+            position = task_ends - 1
+            output[np.where(position >= task_limits, position + task_shift, position)] = self.chars[task_phrases]
+            remaining = task_counts - 1
+            copied = np.minimum(remaining, copy_lengths[task_phrases])
+            before = remaining - copied
+
+            source_tasks = copied > 0
+            previous_tasks = before > 0
+            task_phrases, task_counts, task_ends, task_shift, task_limits = (
+                np.concatenate([sources[task_phrases][source_tasks], task_phrases[previous_tasks] - 1]),
+                np.concatenate([copied[source_tasks], before[previous_tasks]]),
+                np.concatenate([position[source_tasks], (position - copied)[previous_tasks]]),
+                np.concatenate([task_shift[source_tasks], task_shift[previous_tasks]]),
+                np.concatenate([task_limits[source_tasks], task_limits[previous_tasks]]),
+            )
+
+        self.time_extract += time.perf_counter() - start
+        self.extracted_bytes += int(offsets[-1])
+        return offsets, output[:offsets[-1]]
+
+    def decode(self, chunk_size: int = 1 << 20) -> np.ndarray:
+        begins = np.arange(0, len(self), chunk_size)
+        return np.concatenate([self.extract(begins[i:i + 1], np.minimum(begins[i:i + 1] + chunk_size, len(self)))[1]
+                               for i in range(len(begins))] or [np.empty(0, dtype=np.uint8)])
@@ -0,0 +1,113 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from python_algorithms.measurement.rapl import EnergySampler
+from python_algorithms.measurement.runner import Run, run_in_process
+from python_algorithms.text_index.index_file import load_index
+
+# every task is a slice of CHUNKS_PER_WORKER * workers equally large slices of the patterns, so that a slow worker
+# does not hold back the others at the end of a batch
+CHUNKS_PER_WORKER = 4
+BATCH_SIZE = 1000
+# seconds until the workers must have mapped the index
+STARTUP_TIMEOUT = 600.0
+
+# the index and the patterns of a worker process, set by _init_worker
+_worker = {}
+
+def _init_worker(index_filename: str, patterns_name: str, patterns_shape: tuple[int, int], started, errors) -> None:
+    # the index file is memory mapped (read-only pages shared with all other workers through the page cache) and the
+    # patterns are a view of the shared memory block, neither is copied into the worker. A worker that fails does not
+    # raise, the pool would start a new worker that fails the same way forever; it reports the error and breaks the
+    # barrier, so the parent stops waiting
+    try:
+        index, index_file = load_index(index_filename)
+        patterns_memory = SharedMemory(patterns_name)
+    except Exception as error:
+        errors.put(f"{type(error).__name__}: {error}")
+        started.abort()
+        return
+    _worker.update(index=index, index_file=index_file, patterns_memory=patterns_memory,
+                   patterns=np.ndarray(patterns_shape, dtype=np.uint8, buffer=patterns_memory.buf))
+    # the barrier is aborted once all workers have started, a worker that replaces a dead one does not wait
+    try:
+        started.wait()
+    except threading.BrokenBarrierError:
+        pass
+
+def _locate_chunk(task: tuple[int, int, int, bool]) -> tuple[int, np.ndarray, None | list[tuple[np.ndarray, np.ndarray]]]:
+    # the counts of the patterns [start, end) and, if collect, their occurrences like locate
+    start, end, batch_size, collect = task
+    counts = []
+    occurrences = [] if collect else None
+    for offsets, batch_occurrences in _worker["index"].locate(_worker["patterns"][start:end], batch_size):
+        counts.append(np.diff(offsets))
+        if collect:
+            occurrences.append((offsets, batch_occurrences))
+    return start, np.concatenate(counts) if counts else np.empty(0, dtype=np.int64), occurrences
+
+class ParallelLocator:
+    # a process pool over one index file; the patterns of all locate calls are copied once into shared memory
+
+    def __init__(self, index_filename: str, patterns: np.ndarray, workers: int, timeout: float = STARTUP_TIMEOUT):
+        # the index is opened once here, so an invalid index file raises before any worker is started
+        load_index(index_filename)
+        self.workers = workers
+        self.patterns_memory = SharedMemory(create=True, size=max(1, patterns.nbytes))
+        self.patterns = np.ndarray(patterns.shape, dtype=np.uint8, buffer=self.patterns_memory.buf)
+        self.patterns[:] = patterns
+        start = time.perf_counter()
+        # the start-up of the workers (fork, mapping the index) is not part of the queries, so all workers and this
+        # process wait for each other before the first query
+        started = multiprocessing.Barrier(workers + 1)
+        errors = multiprocessing.SimpleQueue()
+        self.pool = multiprocessing.Pool(workers, _init_worker, (index_filename, self.patterns_memory.name, patterns.shape, started, errors))
+        try:
+            started.wait(timeout)
+        except threading.BrokenBarrierError:
+            self.pool.terminate()
+            self.pool.join()
+            self.patterns_memory.close()
+            self.patterns_memory.unlink()
+            error = errors.get() if not errors.empty() else f"the workers did not start within {timeout} s"
+            raise RuntimeError(f"the parallel locate of {index_filename} failed: {error}") from None
+        started.abort()
+        self.time_startup = time.perf_counter() - start
+
+    def locate(self, batch_size: int = BATCH_SIZE, collect: bool = False) -> tuple[np.ndarray, None | list[tuple[np.ndarray, np.ndarray]]]:
+        # the occurrence counts of all patterns and, if collect, the (offsets, occurrences) batches in pattern order;
+        # without collect the occurrences stay in the workers, so only the counts are sent back
+        bounds = np.linspace(0, len(self.patterns), CHUNKS_PER_WORKER * self.workers + 1).astype(np.int64)
+        tasks = [(int(start), int(end), batch_size, collect) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
+        counts = np.empty(len(self.patterns), dtype=np.int64)
+        chunks = {}
+        for start, chunk_counts, occurrences in self.pool.imap_unordered(_locate_chunk, tasks):
+            counts[start:start + len(chunk_counts)] = chunk_counts
+            chunks[start] = occurrences
+        return counts, [batch for start in sorted(chunks) for batch in chunks[start]] if collect else None
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+        self.patterns_memory.close()
+        self.patterns_memory.unlink()
+
+    def __enter__(self) -> "ParallelLocator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def benchmark_parallel_locate(locator: ParallelLocator, sampler: None | EnergySampler, runs: int,
+                              batch_size: int = BATCH_SIZE) -> tuple[list[Run], int]:
+    # one Run per locate of all patterns; returns the runs and the number of occurrences per run
+    occurrences = 0
+    def locate_all() -> None:
+        nonlocal occurrences
+        counts, _ = locator.locate(batch_size)
+        occurrences = int(counts.sum())
+    return [run_in_process(locate_all, sampler) for _ in range(runs)], occurrences
@@ -0,0 +1,130 @@
+import os
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from python_algorithms.text_index.archive import content_hash, get_member, split_archive_path, stream_member
+
+PATTERN_BATCH_SIZE = 1000
+# patterns cached in the binary format are plain .npy (count, length) byte matrices
+BINARY_SUFFIX = ".npy"
+
+
+def parse_header(header: bytes) -> tuple[int, int]:
+    # Pizza&Chili pattern file: one header line "# number=<count> length=<length> file=<text> forbidden=<chars>"
+    # followed by all patterns concatenated without separators
+    fields = dict(field.split("=", 1) for field in header.decode().lstrip("#").split() if "=" in field)
+    return int(fields["number"]), int(fields["length"])
+
+
+def format_header(count: int, length: int, text_name: str, forbidden: bytes = b"") -> bytes:
+    return f"# number={count} length={length} file={text_name} forbidden=".encode() + forbidden + b"\n"
+
+
+def read_patterns(filename: str) -> np.ndarray:
+    # returns a (count, length) byte matrix; .patt and .npy files are memory mapped without copying the body,
+    # archive paths like patterns.7z:patterns/einstein_20000_8.patt are streamed
+    if split_archive_path(filename) is not None:
+        batches = list(stream_pattern_batches(filename, PATTERN_BATCH_SIZE))
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.uint8)
+
+    if filename.endswith(BINARY_SUFFIX):
+        return np.load(filename, mmap_mode="r")
+
+    with open(filename, "rb") as patterns_file:
+        header = patterns_file.readline()
+
+    count, length = parse_header(header)
+    if count * length == 0:
+        return np.empty((count, length), dtype=np.uint8)
+    return np.memmap(filename, dtype=np.uint8, mode="r", offset=len(header), shape=(count, length))
+
+
+def write_patterns(filename: str, patterns: np.ndarray, text_name: str, forbidden: bytes = b"") -> None:
+    # .npy files are written in the binary format, everything else as a Pizza&Chili pattern file
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, "wb") as patterns_file:
+        if filename.endswith(BINARY_SUFFIX):
+            np.save(patterns_file, np.ascontiguousarray(patterns, dtype=np.uint8))
+        else:
+            patterns_file.write(format_header(len(patterns), patterns.shape[1], text_name, forbidden))
+            patterns_file.write(np.ascontiguousarray(patterns, dtype=np.uint8).tobytes())
+    os.replace(tmp_filename, filename)
+
+
+def load_patterns(filename: str, cache_dir: None | str = None) -> np.ndarray:
+    # archive members are parsed once and cached in the binary format keyed by the hash of their packed stream
+    archive_path = split_archive_path(filename)
+    if cache_dir is None or archive_path is None:
+        return read_patterns(filename)
+
+    member = get_member(*archive_path)
+    cache_filename = os.path.join(cache_dir, f"{os.path.basename(member.name)}_{content_hash(member)}{BINARY_SUFFIX}")
+    if not os.path.exists(cache_filename):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_filename = f"{cache_filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "wb") as tmp_file:
+            np.save(tmp_file, read_patterns(filename))
+        os.replace(tmp_filename, cache_filename)
+    return np.load(cache_filename, mmap_mode="r")
+
+
+def generate_patterns(text: np.ndarray, count: int, length: int, seed: int, forbidden: bytes = b"") -> np.ndarray:
+    # random substrings of the text like genpatterns of Pizza&Chili; patterns containing a forbidden character are redrawn
+    if len(text) < length:
+        raise ValueError(f"cannot take patterns of length {length} from a text of length {len(text)}")
+
+    rng = np.random.default_rng(seed)
+    windows = np.lib.stride_tricks.sliding_window_view(text, length)
+    forbidden_chars = np.frombuffer(forbidden, dtype=np.uint8)
+
+    patterns = np.empty((count, length), dtype=np.uint8)
+    missing = np.arange(count)
+    for _ in range(100):
+        if len(missing) == 0:
+            return patterns
+        patterns[missing] = windows[rng.integers(0, len(windows), size=len(missing))]
+        missing = missing[np.isin(patterns[missing], forbidden_chars).any(axis=1)]
+    raise ValueError(f"the text has too few substrings of length {length} without the characters {forbidden!r}")
+
+
+def pattern_batches(chunks: Iterable[memoryview], batch_size: int) -> Iterator[np.ndarray]:
+    # regroups arbitrary chunks of a pattern file into (batch_size, length) matrices; only a partial batch is buffered
+    buffer = bytearray()
+    chunks = iter(chunks)
+    for chunk in chunks:
+        buffer += chunk
+        newline = buffer.find(b"\n")
+        if newline >= 0:
+            break
+    else:
+        raise ValueError("pattern file has no header line")
+
+    count, length = parse_header(bytes(buffer[:newline]))
+    del buffer[:newline + 1]
+    remaining = count
+    batch_bytes = batch_size * length
+
+    while remaining > 0:
+        while len(buffer) < min(batch_bytes, remaining * length):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError(f"pattern file ended with {remaining} of {count} patterns missing")
+            buffer += chunk
+
+        batch_count = min(batch_size, remaining, len(buffer) // length)
+        batch = np.frombuffer(bytes(buffer[:batch_count * length]), dtype=np.uint8).reshape(batch_count, length)
+        del buffer[:batch_count * length]
+        remaining -= batch_count
+        yield batch
+
+
+def stream_pattern_batches(filename: str, batch_size: int = PATTERN_BATCH_SIZE) -> Iterator[np.ndarray]:
+    archive_path = split_archive_path(filename)
+    if archive_path is not None:
+        yield from pattern_batches(stream_member(get_member(*archive_path)), batch_size)
+        return
+
+    patterns = read_patterns(filename)
+    for start in range(0, len(patterns), batch_size):
+        yield patterns[start:start + batch_size]
@@ -0,0 +1,201 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_algorithms.text_index.suffix_array import build_suffix_array
+
+REFERENCE_SIZE = 1 << 20
+SAMPLE_LENGTH = 1024
+# the text is parsed in independent blocks, all blocks advance by one phrase per step of the vectorized parser;
+# a phrase never crosses a block boundary, which costs at most one extra phrase per block
+BLOCK_SIZE = 1 << 12
+CHUNK_LENGTH = 8
+SIGMA = 256
+
+def sample_reference(text: np.ndarray, reference_size: int = REFERENCE_SIZE, sample_length: int = SAMPLE_LENGTH) -> np.ndarray:
+    # evenly spaced samples of the text, concatenated
+    if len(text) <= reference_size:
+        return np.array(text, dtype=np.uint8)
+    samples = max(1, reference_size // sample_length)
+    starts = np.linspace(0, len(text) - sample_length, samples).astype(np.int64)
+    return np.asarray(text)[starts[:, None] + np.arange(sample_length)].ravel()
+
+def _chunk_keys(data: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # the CHUNK_LENGTH bytes at every position as one big endian uint64, bytes past the end are 0
+    offsets = positions[:, None] + np.arange(CHUNK_LENGTH)
+    chunks = np.where(offsets < len(data), data[np.minimum(offsets, len(data) - 1)], 0).astype(np.uint64)
+    return np.bitwise_or.reduce(chunks << (np.uint64(8) * np.arange(CHUNK_LENGTH - 1, -1, -1, dtype=np.uint64)), axis=1)
+
+def _narrow(lo: np.ndarray, hi: np.ndarray, values, targets: np.ndarray, upper: bool) -> np.ndarray:
+    # vectorized binary search of every row in its own range [lo, hi) of a sorted sequence values(rows, positions),
+    # returns the first position whose value is not smaller (upper=False) or greater (upper=True) than the target
+    lo = lo.copy()
+    hi = hi.copy()
+    active = lo < hi
+    while np.any(active):
+        rows = np.flatnonzero(active)
+        mid = (lo[rows] + hi[rows]) // 2
+        found = values(rows, mid)
+        go_right = found <= targets[rows] if upper else found < targets[rows]
+        lo[rows] = np.where(go_right, mid + 1, lo[rows])
+        hi[rows] = np.where(go_right, hi[rows], mid)
+        active = lo < hi
+    return lo
+
+class RLZFactorizer:
+    # greedy relative Lempel-Ziv parsing: every phrase is the longest prefix of the remaining text that occurs in the
+    # reference, found by narrowing the suffix array interval of the reference first CHUNK_LENGTH and then one byte at a time
+
+    def __init__(self, reference: np.ndarray):
+        self.reference = reference
+        self.sa = build_suffix_array(reference).astype(np.int64)
+        m = len(reference)
+        # one sentinel entry for suffixes that are exhausted: key 0 and character -1 are smaller than everything else
+        self.reference_keys = np.append(_chunk_keys(reference, np.arange(m)), np.uint64(0))
+        self.reference_chars = np.append(reference.astype(np.int16), np.int16(-1))
+
+    def longest_matches(self, text: np.ndarray, positions: np.ndarray, limits: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the reference position and length of the longest match of text[position:limit] for all positions at once
+        m = len(self.reference)
+        count = len(positions)
+        lo = np.zeros(count, dtype=np.int64)
+        hi = np.full(count, m, dtype=np.int64)
+        matched = np.zeros(count, dtype=np.int64)
+
+        # whole chunks; a chunk without zero bytes can only be equal to a chunk that is completely inside the reference
+        extending = np.ones(count, dtype=bool)
+        while True:
+            rows = np.flatnonzero(extending & (positions + matched + CHUNK_LENGTH <= limits))
+            if len(rows) == 0:
+                break
+            rows = rows[np.all(text[(positions[rows] + matched[rows])[:, None] + np.arange(CHUNK_LENGTH)] != 0, axis=1)]
+            targets = _chunk_keys(text, positions[rows] + matched[rows])
+            values = lambda r, mid: self.reference_keys[np.minimum(self.sa[mid] + matched[rows[r]], m)]
+            begin = _narrow(lo[rows], hi[rows], values, targets, upper=False)
+            end = _narrow(begin, hi[rows], values, targets, upper=True)
+            found = begin < end
+            extending[:] = False
+            extending[rows[found]] = True
+            lo[rows[found]] = begin[found]
+            hi[rows[found]] = end[found]
+            matched[rows[found]] += CHUNK_LENGTH
+
+        # the remaining characters one at a time
+        extending = np.ones(count, dtype=bool)
+        while True:
+            rows = np.flatnonzero(extending & (positions + matched < limits))
+            if len(rows) == 0:
+                break
+            targets = text[positions[rows] + matched[rows]].astype(np.int16)
+            values = lambda r, mid: self.reference_chars[np.minimum(self.sa[mid] + matched[rows[r]], m)]
+            begin = _narrow(lo[rows], hi[rows], values, targets, upper=False)
+            end = _narrow(begin, hi[rows], values, targets, upper=True)
+            found = begin < end
+            extending[:] = False
+            extending[rows[found]] = True
+            lo[rows[found]] = begin[found]
+            hi[rows[found]] = end[found]
+            matched[rows[found]] += 1
+
+        return self.sa[np.minimum(lo, m - 1)], matched
+
+    def parse(self, text: np.ndarray, block_size: int = BLOCK_SIZE) -> tuple[np.ndarray, np.ndarray]:
+        # the phrases (source, length) in text order; a character without any match in the reference becomes a
+        # literal phrase with source len(reference) + character, see RLZArchive
+        text = np.asarray(text)
+        cursors = np.arange(0, len(text), block_size, dtype=np.int64)
+        limits = np.minimum(cursors + block_size, len(text))
+        phrase_starts = []
+        phrase_sources = []
+        phrase_lengths = []
+        active = np.flatnonzero(cursors < limits)
+        while len(active) > 0:
+            sources, lengths = self.longest_matches(text, cursors[active], limits[active])
+            literal = lengths == 0
+            sources[literal] = len(self.reference) + text[cursors[active][literal]].astype(np.int64)
+            lengths[literal] = 1
+            phrase_starts.append(cursors[active])
+            phrase_sources.append(sources)
+            phrase_lengths.append(lengths)
+            cursors[active] += lengths
+            active = active[cursors[active] < limits[active]]
+
+        if not phrase_starts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        order = np.argsort(np.concatenate(phrase_starts))
+        return np.concatenate(phrase_sources)[order], np.concatenate(phrase_lengths)[order]
+
+@dataclass
+class RLZStatistics:
+    n: int = 0
+    phrases: int = 0
+    literals: int = 0
+    time_reference: float = 0.0
+    time_parse: float = 0.0
+    time_extract: float = 0.0
+    extracted_bytes: int = 0
+
+    def extraction_throughput(self) -> float:
+        # extracted bytes per second
+        return self.extracted_bytes / self.time_extract if self.time_extract > 0 else 0.0
+
+class RLZArchive:
+    # the reference followed by the 256 characters, so that every phrase, literals included, is the substring
+    # source_text[source:source + length]; sources and lengths use the smallest unsigned dtype that fits
+
+    def __init__(self, text: np.ndarray, reference_size: int = REFERENCE_SIZE, sample_length: int = SAMPLE_LENGTH,
+                 block_size: int = BLOCK_SIZE):
+        self.statistics = RLZStatistics(n=len(text))
+
+        start = time.perf_counter()
+        reference = sample_reference(text, reference_size, sample_length)
+        factorizer = RLZFactorizer(reference)
+        self.statistics.time_reference = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sources, lengths = factorizer.parse(text, block_size)
+        self.statistics.time_parse = time.perf_counter() - start
+
+        self.reference = reference
+        self.sources = sources.astype(np.min_scalar_type(len(reference) + SIGMA - 1))
+        self.lengths = lengths.astype(np.min_scalar_type(max(1, int(lengths.max(initial=1)))))
+        self.statistics.phrases = len(sources)
+        self.statistics.literals = int(np.sum(sources >= len(reference)))
+        self._prepare()
+
+    def _prepare(self) -> None:
+        self.source_text = np.concatenate([self.reference, np.arange(SIGMA, dtype=np.uint8)])
+        self.phrase_starts = np.zeros(len(self.lengths) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=self.phrase_starts[1:])
+
+    def __len__(self) -> int:
+        return int(self.phrase_starts[-1])
+
+    def size_in_bytes(self) -> int:
+        # the stored arrays, the phrase starts are recomputed from the lengths
+        return self.reference.nbytes + self.sources.nbytes + self.lengths.nbytes
+
+    def compression_ratio(self) -> float:
+        return len(self) / self.size_in_bytes()
+
+    def extract(self, begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the intervals text[begin:end] of all rows at once as (offsets, data) like SuffixArrayIndex.locate,
+        # the i-th interval is data[offsets[i]:offsets[i+1]]
+        start = time.perf_counter()
+        begins = np.asarray(begins, dtype=np.int64)
+        lengths = np.asarray(ends, dtype=np.int64) - begins
+        offsets = np.zeros(len(begins) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(begins - offsets[:-1], lengths) + np.arange(offsets[-1])
+        phrases = np.searchsorted(self.phrase_starts, positions, side="right") - 1
+        data = self.source_text[self.sources[phrases].astype(np.int64) + positions - self.phrase_starts[phrases]]
+        self.statistics.time_extract += time.perf_counter() - start
+        self.statistics.extracted_bytes += int(offsets[-1])
+        return offsets, data
+
+    def decode(self, chunk_size: int = 1 << 24) -> np.ndarray:
+        # extracts the text in chunks, the positions of one chunk are the largest temporary array
+        begins = np.arange(0, len(self), chunk_size)
+        return np.concatenate([self.extract(begins[i:i + 1], np.minimum(begins[i:i + 1] + chunk_size, len(self)))[1]
+                               for i in range(len(begins))] or [np.empty(0, dtype=np.uint8)])
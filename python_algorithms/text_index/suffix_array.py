@@ -0,0 +1,181 @@
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+CACHE_LINE_SIZE = 64
+
+def build_suffix_array(text: np.ndarray) -> np.ndarray:
+    # prefix doubling in the style of Larsson and Sadakane: after the round with offset h the suffixes are sorted by
+    # their first 2h characters and only the suffixes that are not in a singleton group are sorted again;
+    # the rank of a suffix is the suffix array position of the first suffix in its group
+    n = len(text)
+    sa = np.argsort(text, kind="stable").astype(np.int64)
+    rank = np.empty(n, dtype=np.int64)
+
+    sorted_chars = text[sa]
+    new_group = np.empty(n, dtype=bool)
+    new_group[:1] = True
+    np.not_equal(sorted_chars[1:], sorted_chars[:-1], out=new_group[1:])
+    unsorted = np.arange(n, dtype=np.int64)
+
+    h = 1
+    while True:
+        # the unsorted positions are increasing and contain whole groups, so the running maximum of the group
+        # starts is the start of the own group
+        rank[sa[unsorted]] = np.maximum.accumulate(np.where(new_group, unsorted, 0))
+
+        group_ids = np.cumsum(new_group) - 1
+        unsorted = unsorted[np.bincount(group_ids)[group_ids] > 1]
+        if len(unsorted) == 0:
+            break
+
+        suffixes = sa[unsorted]
+        first = rank[suffixes]
+        second = np.full(len(suffixes), -1, dtype=np.int64) # the end of the text is smaller than every suffix
+        in_text = suffixes + h < n
+        second[in_text] = rank[suffixes[in_text] + h]
+
+        # both keys are smaller than n, so they are packed into one int64 key (ties end up in the same group anyway)
+        order = np.argsort(first * (n + 1) + (second + 1))
+        sa[unsorted] = suffixes[order]
+        first = first[order]
+        second = second[order]
+
+        new_group = np.empty(len(unsorted), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+        h *= 2
+
+    return sa.astype(np.int32 if n < 2**31 else np.int64)
+
+@dataclass
+class QueryStatistics:
+    queries: int = 0
+    occurrences: int = 0
+    search_steps: int = 0 # binary search steps of all queries
+    bytes_touched: int = 0 # suffix array entries and text bytes read by the queries
+    cache_lines_touched: int = 0 # upper bound of distinct cache lines read by the queries
+    time_count: float = 0.0
+    time_locate: float = 0.0
+    time_extract: float = 0.0
+
+    def per_query(self) -> dict[str, float]:
+        return {
+            "occurrences": self.occurrences / self.queries,
+            "search_steps": self.search_steps / self.queries,
+            "bytes_touched": self.bytes_touched / self.queries,
+            "cache_lines_touched": self.cache_lines_touched / self.queries,
+            "time": (self.time_count + self.time_locate + self.time_extract) / self.queries,
+        }
+
+def interval_positions(begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # the text positions of all intervals [begin, end) concatenated, the i-th interval is positions[offsets[i]:offsets[i+1]]
+    begins = np.asarray(begins, dtype=np.int64)
+    lengths = np.maximum(np.asarray(ends, dtype=np.int64) - begins, 0)
+    offsets = np.zeros(len(begins) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, np.repeat(begins - offsets[:-1], lengths) + np.arange(offsets[-1])
+
+class SuffixArrayIndex:
+
+    def __init__(self, text: np.ndarray, sa: None | np.ndarray = None):
+        self.text = text
+        self.sa = build_suffix_array(text) if sa is None else sa
+        self.statistics = QueryStatistics()
+
+    def size_in_bytes(self) -> int:
+        return self.text.nbytes + self.sa.nbytes
+
+    def index_attributes(self) -> dict:
+        return {}
+
+    def index_arrays(self) -> dict[str, np.ndarray]:
+        return {"text": self.text, "sa": self.sa}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], attributes: dict) -> "SuffixArrayIndex":
+        return cls(arrays["text"], arrays["sa"])
+
+    def _compare(self, positions: np.ndarray, patterns: np.ndarray) -> np.ndarray:
+        # compares the suffixes starting at positions with the patterns (one per row) for all rows at once,
+        # returns -1/0/1 if the length m prefix of the suffix is smaller/equal/greater than the pattern
+        m = patterns.shape[1]
+        offsets = positions[:, None].astype(np.int64) + np.arange(m)
+        past_end = offsets >= len(self.text)
+        prefixes = self.text[np.minimum(offsets, len(self.text) - 1)].astype(np.int16)
+        prefixes[past_end] = -1 # the end of the text is smaller than every character
+
+        differs = prefixes != patterns
+        first_difference = np.argmax(differs, axis=1)
+        rows = np.arange(len(patterns))
+        return np.where(differs[rows, first_difference],
+                        np.sign(prefixes[rows, first_difference] - patterns[rows, first_difference]), 0)
+
+    def _search(self, patterns: np.ndarray, upper: bool) -> np.ndarray:
+        # vectorized binary search over all patterns, returns the first suffix array position whose prefix is
+        # not smaller (upper=False) or greater (upper=True) than the pattern
+        lo = np.zeros(len(patterns), dtype=np.int64)
+        hi = np.full(len(patterns), len(self.sa), dtype=np.int64)
+        active = lo < hi
+        steps = 0
+        while np.any(active):
+            rows = np.flatnonzero(active)
+            mid = (lo[rows] + hi[rows]) // 2
+            comparison = self._compare(self.sa[mid], patterns[rows])
+            go_right = comparison <= 0 if upper else comparison < 0
+            lo[rows] = np.where(go_right, mid + 1, lo[rows])
+            hi[rows] = np.where(go_right, hi[rows], mid)
+            active = lo < hi
+            steps += len(rows)
+
+        m = patterns.shape[1]
+        self.statistics.search_steps += steps
+        self.statistics.bytes_touched += steps * (self.sa.itemsize + m)
+        self.statistics.cache_lines_touched += steps * (1 + (m + CACHE_LINE_SIZE - 1) // CACHE_LINE_SIZE)
+        return lo
+
+    def ranges(self, patterns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the suffix array interval [begin, end) of every pattern
+        patterns = patterns.astype(np.int16)
+        return self._search(patterns, upper=False), self._search(patterns, upper=True)
+
+    def count(self, patterns: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        begin, end = self.ranges(patterns)
+        self.statistics.time_count += time.perf_counter() - start
+        self.statistics.queries += len(patterns)
+        return end - begin
+
+    def locate(self, patterns: np.ndarray, batch_size: int = 1000) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        # yields the occurrences of batch_size patterns at a time as (offsets, occurrences), the occurrences of the
+        # i-th pattern of the batch are occurrences[offsets[i]:offsets[i+1]]; batching bounds the memory usage
+        for batch_start in range(0, len(patterns), batch_size):
+            start = time.perf_counter()
+            begin, end = self.ranges(patterns[batch_start:batch_start + batch_size])
+            counts = end - begin
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            sa_positions = np.repeat(begin - offsets[:-1], counts) + np.arange(offsets[-1])
+            occurrences = self.sa[sa_positions]
+            self.statistics.time_locate += time.perf_counter() - start
+
+            self.statistics.queries += len(counts)
+            self.statistics.occurrences += int(offsets[-1])
+            self.statistics.bytes_touched += int(offsets[-1]) * self.sa.itemsize
+            self.statistics.cache_lines_touched += int(np.sum((counts * self.sa.itemsize + CACHE_LINE_SIZE - 1) // CACHE_LINE_SIZE))
+            yield offsets, occurrences
+
+    def extract(self, begins: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the intervals text[begin:end] as (offsets, data) like RLZArchive.extract, the text is stored plainly
+        start = time.perf_counter()
+        offsets, positions = interval_positions(begins, ends)
+        data = self.text[positions]
+        self.statistics.time_extract += time.perf_counter() - start
+
+        lengths = np.diff(offsets)
+        self.statistics.queries += len(lengths)
+        self.statistics.bytes_touched += int(offsets[-1])
+        self.statistics.cache_lines_touched += int(np.sum((lengths + CACHE_LINE_SIZE - 1) // CACHE_LINE_SIZE + (lengths > 0)))
+        return offsets, data
@@ -1,51 +1,91 @@
 import sys
 
-import numpy as np
 import argparse
 import time
-from python_algorithms.insertion_sort import *
-from python_algorithms.selection_sort import *
+from python_algorithms.sort_registry import SORT_ALGORITHMS, get_sort_algorithm, prepare_input
+from python_algorithms.sort_benchmark import load_array, time_sort, write_batch_results
+from python_algorithms.sort_sweep import run_sweep
+from python_algorithms.measurement.profiling import configure_profiling, profile_region
 
 start_generate = time.perf_counter()
 
+# legacy flags, each one selects a single algorithm of the registry
+legacy_flags = {
+    "builtin": "builtin",
+    "numpy": "numpy",
+    "insertion_sort": "insertion",
+    "selection_sort": "selection",
+    "numpy_insertion_sort": "numpy_insertion",
+    "numpy_selection_sort": "numpy_selection",
+}
+
 parser = argparse.ArgumentParser()
-parser.add_argument("-n", default=1024)
-parser.add_argument("--seed", "-s", default=5)
+parser.add_argument("-n", nargs="+", default=[1024], help="size of the array, several sizes are only allowed with --batch")
+parser.add_argument("--seed", "-s", nargs="+", default=[5], help="seed, several seeds are only allowed with --batch")
 parser.add_argument("--iterations", "-i", default=10)
-parser.add_argument("--builtin", action="store_true")
-parser.add_argument("--numpy", action="store_true")
-parser.add_argument("--insertion_sort", action="store_true")
-parser.add_argument("--selection_sort", action="store_true")
+parser.add_argument("--algorithm", "-a", nargs="+", default=[], choices=SORT_ALGORITHMS.keys())
+for flag in legacy_flags:
+    parser.add_argument(f"--{flag}", action="store_true")
+parser.add_argument("--scratch", action="store_true", help="refill one preallocated buffer and report copy and sort time separately")
+parser.add_argument("--cache_dir", default=None, help="cache the generated arrays as memory-mapped .npy files in this directory")
+parser.add_argument("--batch", metavar="RESULTS_CSV", help="sweep all sizes, seeds and algorithms and write per-iteration timings to RESULTS_CSV")
+parser.add_argument("--workers", "-w", default=1, help="number of worker processes for --batch")
+parser.add_argument("--serial", action="store_true", help="run --batch one configuration after another in this process (for energy measurements)")
+parser.add_argument("--profile", metavar="PROFILE_CSV", default=None, help="write time, cpu time and energy of the generate and sort phases to PROFILE_CSV")
+parser.add_argument("--profile_cache_misses", action="store_true", help="also count the cache misses of the phases with perf_event_open")
+parser.add_argument("--pin_cpus", action="store_true", help="pin every worker of --batch to its own cpu")
 
 args = parser.parse_args()
-n = int(args.n)
-seed = int(args.seed)
+sizes = [int(n) for n in args.n]
+seeds = [int(seed) for seed in args.seed]
 iterations = int(args.iterations)
-if sum([args.builtin, args.numpy, args.insertion_sort, args.selection_sort]) != 1:
-    print("[Error] Please choose either builtin, numpy, insertion or selection sort.")
+algorithm_names = args.algorithm + [name for flag, name in legacy_flags.items() if getattr(args, flag)]
+algorithms = [get_sort_algorithm(name) for name in algorithm_names]
+if args.profile:
+    configure_profiling(args.profile, cache_misses=args.profile_cache_misses)
+
+if args.batch:
+    if len(algorithms) == 0:
+        print("[Error] Please choose at least one sort algorithm.")
+        sys.exit()
+
+    workers = 1 if args.serial else int(args.workers)
+    rows = run_sweep(algorithm_names, sizes, seeds, iterations, args.scratch, args.cache_dir, workers, args.pin_cpus)
+    write_batch_results(args.batch, rows)
+    print(f"{len(rows)} timings of {', '.join(algorithm_names)} were written to {args.batch}.")
+    sys.exit()
+
+if len(algorithms) != 1 or len(sizes) != 1 or len(seeds) != 1:
+    print(f"[Error] Please choose exactly one size, one seed and one of the sort algorithms: {', '.join(SORT_ALGORITHMS.keys())}.")
     sys.exit()
 
-# generates the same arrays as the c++ version
-rng = np.random.RandomState(seed)
-a = (rng.randint(0, 2**32, size=n, dtype=np.uint32) % n).astype(np.uint32)
-if args.builtin:
-    a = a.tolist()
+algorithm = algorithms[0]
+n = sizes[0]
+seed = seeds[0]
+
+with profile_region("generate"):
+    a = load_array(n, seed, args.cache_dir)
+    if not args.scratch:
+        a = prepare_input(algorithm, a)
 
 end_generate = time.perf_counter()
 
 print(f"The random generation of the array a (size={n}) was done in {end_generate - start_generate} s.")
 
+if args.scratch:
+    with profile_region("sort"):
+        copy_times, sort_times = time_sort(algorithm, a, iterations, scratch=True)
+    print(f"The scratch buffer was refilled in {sum(copy_times)} s.")
+    print(f"The array a was sorted with {algorithm.name} in {sum(sort_times)} s.")
+    sys.exit()
+
 start_sort = time.perf_counter()
 
-for _ in range(iterations):
-    b = a.copy()
-    if args.builtin or args.numpy:
-        b.sort()
-    elif args.insertion_sort:
-        insertion_sort(b)
-    elif args.selection_sort:
-        selection_sort(b)
+with profile_region("sort"):
+    for _ in range(iterations):
+        b = a.copy()
+        algorithm.sort(b)
 
 end_sort = time.perf_counter()
 
-print(f"The array a was sorted with {'numpy' if args.numpy else 'builtin'} in {end_sort - start_sort} s.")
\ No newline at end of file
+print(f"The array a was sorted with {algorithm.name} in {end_sort - start_sort} s.")
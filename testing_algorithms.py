@@ -0,0 +1,33 @@
+import argparse
+import time
+
+from python_algorithms.pointer_chase import WORKING_SET_SIZES, single_cycle_permutation, chase
+
+parser = argparse.ArgumentParser()
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+# the working sets of ./bin/TestingAlgorithms chase, but it measures the throughput of independent walks instead of
+# the latency of one dependent walk, so it does not reproduce the latency curve of TestingAlgorithms
+chase_parser = subparsers.add_parser("chase", help="memory throughput in ns per access of independent pointer chasing walks, "
+                                                   "not the dependent-load latency of ./bin/TestingAlgorithms chase")
+chase_parser.add_argument("--size", nargs="+", default=list(WORKING_SET_SIZES.values()),
+                          help="working set sizes in bytes, standard are the sizes of measurements/cache_efficiency")
+chase_parser.add_argument("--iterations", "-i", default=10_000_000)
+chase_parser.add_argument("--seed", default=42)
+chase_parser.add_argument("--lanes", default=1024,
+                          help="number of independent walks that advance together, their cache misses overlap; "
+                               "1 would be one dependent walk, but its time is dominated by the interpreter")
+
+args = parser.parse_args()
+
+if args.command == "chase":
+    iterations = int(args.iterations)
+    print("# Size,Accesses,Time,ThroughputNsPerAccess,InitTime")
+    for size in map(int, args.size):
+        start_generate = time.perf_counter()
+        next_idx, starts = single_cycle_permutation(size, int(args.seed), int(args.lanes))
+        end_generate = time.perf_counter()
+
+        elapsed, accesses = chase(next_idx, starts, iterations)
+        print(f"{size},{accesses},{elapsed},{elapsed / accesses * 1e9},{end_generate - start_generate}")
+        del next_idx, starts
@@ -0,0 +1,300 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from python_algorithms.text_index.archive import read_text, split_archive_path, stream_text
+from python_algorithms.text_index.patterns import BINARY_SUFFIX, generate_patterns, load_patterns, write_patterns
+from python_algorithms.text_index.suffix_array import SuffixArrayIndex
+from python_algorithms.text_index.fm_index import RunLengthFMIndex
+from python_algorithms.measurement.profiling import configure_profiling, profile_region
+from python_algorithms.measurement.rapl import POWERCAP_DIR, SAMPLE_INTERVAL, EnergySampler, find_domains
+from python_algorithms.measurement.runner import Program, write_programs, write_results
+from python_algorithms.text_index.extraction import BATCH_SIZE, EXTRACTORS, INTERVAL_LENGTH, benchmark_extraction, build_extractor, generate_intervals, text_length
+from python_algorithms.text_index.incremental import append_text
+from python_algorithms.text_index.parallel import ParallelLocator, benchmark_parallel_locate
+from python_algorithms.text_index.lz_end import PHASES, WINDOW_SIZE, LZEndParser
+from python_algorithms.text_index.rlz import BLOCK_SIZE, REFERENCE_SIZE, SAMPLE_LENGTH, RLZArchive
+from python_algorithms.text_index.index_file import IndexFile, is_index_file, load_index, save_index
+
+@profile_region("build")
+def build_index(text_filename: str, index_kind: str, sample_rate: int, prefix: None | str, cache_dir: None | str) -> SuffixArrayIndex | RunLengthFMIndex:
+    start_build = time.perf_counter()
+    text = read_text(text_filename, None if prefix is None else int(prefix), cache_dir)
+    index = SuffixArrayIndex(text) if index_kind == "sa" else RunLengthFMIndex(text, sample_rate=sample_rate)
+    end_build = time.perf_counter()
+    print(f"The {index_kind} index of the text (size={len(text)}) was built in {end_build - start_build} s.")
+    return index
+
+def add_build_arguments(subparser):
+    subparser.add_argument("--index", "-x", default="sa", choices=["sa", "fm"], help="plain suffix array or run-length compressed FM-index")
+    subparser.add_argument("--sample_rate", default=32, help="suffix array sample rate of the FM-index")
+    subparser.add_argument("--prefix", default=None, help="only index the first PREFIX bytes of the text")
+    subparser.add_argument("--cache_dir", default=None, help="extract archive members once into CACHE_DIR (e.g. tmp/archive_cache) "
+                                                             "instead of streaming them on every run")
+    subparser.add_argument("--profile", metavar="PROFILE_CSV", default=None, help="write time, cpu time and energy of the build and query phases to PROFILE_CSV")
+
+parser = argparse.ArgumentParser()
+subparsers = parser.add_subparsers(dest="mode", required=True)
+
+build_parser = subparsers.add_parser("build", help="build an index and write it to an index file")
+build_parser.add_argument("text", help="text file or archive member, e.g. texts.7z:einstein")
+build_parser.add_argument("output", help="index file, e.g. tmp/einstein.sa")
+add_build_arguments(build_parser)
+
+append_parser = subparsers.add_parser("append", help="append a text to a suffix array index file without rebuilding the whole index")
+append_parser.add_argument("index", help="sa index file written by build or append")
+append_parser.add_argument("appended", help="text file or archive member that is appended to the indexed text")
+append_parser.add_argument("output", help="index file of the grown text, must differ from INDEX since INDEX is memory mapped")
+append_parser.add_argument("--fm_output", default=None, help="also write the FM-index of the grown text, built from the merged suffix array")
+append_parser.add_argument("--sample_rate", default=32, help="suffix array sample rate of the FM-index")
+append_parser.add_argument("--prefix", default=None, help="only append the first PREFIX bytes")
+append_parser.add_argument("--cache_dir", default=None)
+
+for mode in ["count", "locate"]:
+    query_parser = subparsers.add_parser(mode)
+    query_parser.add_argument("index_or_text", help="index file written by build (memory mapped) or a text file or archive member (indexed in memory)")
+    query_parser.add_argument("patterns", help="Pizza&Chili pattern file or archive member, e.g. patterns.7z:patterns/einstein_20000_8.patt")
+    query_parser.add_argument("--batch_size", "-b", default=1000, help="number of patterns that are located at once")
+    add_build_arguments(query_parser)
+
+patterns_parser = subparsers.add_parser("patterns", help="generate pattern files of random substrings of a text")
+patterns_parser.add_argument("text", help="text file or archive member, e.g. texts.7z:einstein")
+patterns_parser.add_argument("output_dir", help="the pattern files are named like patterns.7z, e.g. einstein_20000_8.patt")
+patterns_parser.add_argument("--count", "-c", default=20000, help="number of patterns per file")
+patterns_parser.add_argument("--length", "-l", nargs="+", default=[8], help="one pattern file per length")
+patterns_parser.add_argument("--seed", "-s", default=0)
+patterns_parser.add_argument("--forbidden", default="", help="characters that must not occur in a pattern")
+patterns_parser.add_argument("--prefix", default=None, help="only take patterns from the first PREFIX bytes of the text")
+patterns_parser.add_argument("--cache_dir", default=None)
+patterns_parser.add_argument("--binary", action="store_true", help="write .npy byte matrices instead of Pizza&Chili files")
+
+rlz_parser = subparsers.add_parser("rlz", help="compress a text with relative Lempel-Ziv and measure random access extraction")
+rlz_parser.add_argument("text", help="text file or archive member, e.g. texts.7z:einstein")
+rlz_parser.add_argument("--reference_size", default=REFERENCE_SIZE, help="size of the reference sampled from the text")
+rlz_parser.add_argument("--sample_length", default=SAMPLE_LENGTH, help="length of one sample of the reference")
+rlz_parser.add_argument("--block_size", default=BLOCK_SIZE, help="the text is parsed in independent blocks of this size")
+rlz_parser.add_argument("--intervals", default=10000, help="number of random intervals that are extracted")
+rlz_parser.add_argument("--interval_length", default=1000)
+rlz_parser.add_argument("--seed", "-s", default=0)
+rlz_parser.add_argument("--prefix", default=None, help="only compress the first PREFIX bytes of the text")
+rlz_parser.add_argument("--cache_dir", default=None)
+
+lzend_parser = subparsers.add_parser("lzend", help="compress a text with LZ-End in streaming windows and measure random access extraction")
+lzend_parser.add_argument("text", help="text file or archive member, e.g. texts.7z:einstein")
+lzend_parser.add_argument("--window_size", default=WINDOW_SIZE, help="the text is read in windows of this size, sources lie in the current or the previous window")
+lzend_parser.add_argument("--intervals", default=10000, help="number of random intervals that are extracted")
+lzend_parser.add_argument("--interval_length", default=1000)
+lzend_parser.add_argument("--seed", "-s", default=0)
+lzend_parser.add_argument("--prefix", default=None, help="only compress the first PREFIX bytes of the text")
+
+parallel_parser = subparsers.add_parser("parallel_locate", help="locate a pattern batch with a pool of worker processes that share one memory mapped index")
+parallel_parser.add_argument("index_or_text", help="index file written by build or a text file or archive member (indexed into tmp/ first)")
+parallel_parser.add_argument("patterns", help="Pizza&Chili pattern file or archive member, e.g. patterns.7z:patterns/einstein_20000_8.patt")
+parallel_parser.add_argument("--workers", "-w", nargs="+", default=[1, 2, 4], help="one measurement per number of worker processes")
+parallel_parser.add_argument("--batch_size", "-b", default=1000, help="number of patterns that a worker locates at once")
+parallel_parser.add_argument("--runs", "-n", default=5, help="number of measured locates of all patterns per worker count")
+parallel_parser.add_argument("--output_dir", "-o", default=None, help="write results.csv per worker count into this experiment directory")
+parallel_parser.add_argument("--domain", "-d", nargs="+", default=None, help="RAPL domains to sum up, defaults to all packages")
+parallel_parser.add_argument("--interval", default=SAMPLE_INTERVAL, help="seconds between two samples of the energy counters")
+parallel_parser.add_argument("--powercap_dir", default=POWERCAP_DIR)
+add_build_arguments(parallel_parser)
+
+extract_parser = subparsers.add_parser("extract", help="measure time and energy of random interval extraction (decompression) for every index")
+extract_parser.add_argument("text", help="text file or archive member, e.g. texts.7z:einstein")
+extract_parser.add_argument("--index", "-x", nargs="+", default=EXTRACTORS, choices=EXTRACTORS, help="mmap is the plain memory mapped text without an index")
+extract_parser.add_argument("--count", "-c", default=10000, help="number of intervals per run")
+extract_parser.add_argument("--min_length", default=INTERVAL_LENGTH)
+extract_parser.add_argument("--max_length", default=INTERVAL_LENGTH)
+extract_parser.add_argument("--seed", "-s", default=0)
+extract_parser.add_argument("--batch_size", "-b", default=BATCH_SIZE, help="number of intervals that are extracted at once")
+extract_parser.add_argument("--runs", "-n", default=12, help="number of measured runs of every index")
+extract_parser.add_argument("--sample_rate", default=32, help="suffix array sample rate of the FM-index")
+extract_parser.add_argument("--prefix", default=None, help="only extract from the first PREFIX bytes of the text")
+extract_parser.add_argument("--cache_dir", default=None)
+extract_parser.add_argument("--output_dir", "-o", default=None, help="experiment directory like measurements/<experiment>, "
+                                                                     "defaults to measurements/interval_extraction_<text>")
+extract_parser.add_argument("--domain", "-d", nargs="+", default=None, help="RAPL domains to sum up, defaults to all packages")
+extract_parser.add_argument("--interval", default=SAMPLE_INTERVAL, help="seconds between two samples of the energy counters")
+extract_parser.add_argument("--powercap_dir", default=POWERCAP_DIR)
+
+info_parser = subparsers.add_parser("info", help="report the resident and total bytes of index files")
+info_parser.add_argument("index_files", nargs="+")
+
+args = parser.parse_args()
+if getattr(args, "profile", None):
+    configure_profiling(args.profile)
+
+if args.mode == "build":
+    index = build_index(args.text, args.index, int(args.sample_rate), args.prefix, args.cache_dir)
+    save_index(index, args.output)
+    print(f"The index was written to {args.output}.")
+
+elif args.mode == "append":
+    if os.path.abspath(args.output) == os.path.abspath(args.index):
+        parser.error("the output must not overwrite the memory mapped index")
+    index, index_file = load_index(args.index)
+    if not isinstance(index, SuffixArrayIndex):
+        parser.error(f"{args.index} is a {index_file.kind} index, appending needs the suffix array (sa) of the text")
+    appended = read_text(args.appended, None if args.prefix is None else int(args.prefix), args.cache_dir)
+    index, statistics = append_text(index, appended)
+    print(f"{statistics.appended} bytes were appended to the index of the text (size={statistics.n}) in {statistics.total_time()} s, "
+          f"{statistics.tail} suffixes were sorted again ({statistics.time_sort} s), merging took {statistics.time_rank + statistics.time_merge} s.")
+    save_index(index, args.output)
+    print(f"The index was written to {args.output}.")
+    if args.fm_output is not None:
+        start_fm = time.perf_counter()
+        save_index(RunLengthFMIndex(index.text, index.sa, int(args.sample_rate)), args.fm_output)
+        print(f"The fm index was built from the merged suffix array in {time.perf_counter() - start_fm} s and written to {args.fm_output}.")
+
+elif args.mode == "patterns":
+    text = read_text(args.text, None if args.prefix is None else int(args.prefix), args.cache_dir)
+    archive_path = split_archive_path(args.text)
+    text_name = os.path.basename(args.text if archive_path is None else archive_path[1] or archive_path[0].removesuffix(".7z"))
+    os.makedirs(args.output_dir, exist_ok=True)
+    for length in map(int, args.length):
+        start_generate = time.perf_counter()
+        patterns = generate_patterns(text, int(args.count), length, int(args.seed), args.forbidden.encode())
+        filename = os.path.join(args.output_dir, f"{text_name}_{args.count}_{length}{BINARY_SUFFIX if args.binary else '.patt'}")
+        write_patterns(filename, patterns, text_name, args.forbidden.encode())
+        print(f"{len(patterns)} patterns of length {length} were written to {filename} in {time.perf_counter() - start_generate} s.")
+
+elif args.mode == "rlz":
+    text = read_text(args.text, None if args.prefix is None else int(args.prefix), args.cache_dir)
+    archive = RLZArchive(text, int(args.reference_size), int(args.sample_length), int(args.block_size))
+    statistics = archive.statistics
+    print(f"The text (size={len(text)}) was parsed into {statistics.phrases} phrases ({statistics.literals} literals) "
+          f"in {statistics.time_reference + statistics.time_parse} s ({statistics.time_reference} s for the reference).")
+
+    interval_length = min(int(args.interval_length), len(text))
+    begins = np.random.default_rng(int(args.seed)).integers(0, len(text) - interval_length + 1, size=int(args.intervals))
+    archive.extract(begins, begins + interval_length)
+    print(f"{args.intervals} intervals of length {interval_length} were extracted in {statistics.time_extract} s, "
+          f"{statistics.extraction_throughput() / 1e6} MB/s.")
+    # in MB like idx_sizes in webapp/energy_efficient_algorithms/compression_emissions.py
+    print(f"The archive has a size of {archive.size_in_bytes() / 1e6} MB, a compression ratio of {archive.compression_ratio()}.")
+
+elif args.mode == "lzend":
+    start_parse = time.perf_counter()
+    archive = LZEndParser(int(args.window_size)).parse_stream(stream_text(args.text, None if args.prefix is None else int(args.prefix)))
+    statistics = archive.statistics
+    print(f"The text (size={statistics.n}) was parsed into {statistics.phrases} phrases in {statistics.windows} windows "
+          f"in {time.perf_counter() - start_parse} s.")
+    for phase in PHASES:
+        print(f"The {phase} phase took {statistics.phase_times[phase]} s with a peak resident set size of {statistics.phase_peaks[phase] / 1e6} MB.")
+
+    interval_length = min(int(args.interval_length), statistics.n)
+    begins = np.random.default_rng(int(args.seed)).integers(0, statistics.n - interval_length + 1, size=int(args.intervals))
+    archive.extract(begins, begins + interval_length)
+    print(f"{args.intervals} intervals of length {interval_length} were extracted in {archive.time_extract} s, "
+          f"{archive.extraction_throughput() / 1e6} MB/s.")
+    print(f"The archive has a size of {archive.size_in_bytes() / 1e6} MB, a compression ratio of {archive.compression_ratio()}.")
+
+elif args.mode == "parallel_locate":
+    index_filename = args.index_or_text
+    if not is_index_file(index_filename):
+        index = build_index(args.index_or_text, args.index, int(args.sample_rate), args.prefix, args.cache_dir)
+        os.makedirs("tmp", exist_ok=True)
+        index_filename = os.path.join("tmp", f"{os.path.basename(args.index_or_text.replace(':', '_'))}.{args.index}")
+        save_index(index, index_filename)
+        del index
+        print(f"The index was written to {index_filename}.")
+    patterns = np.ascontiguousarray(load_patterns(args.patterns, args.cache_dir))
+
+    try:
+        sampler = EnergySampler(find_domains(args.powercap_dir, args.domain), float(args.interval))
+    except (RuntimeError, OSError) as error:
+        print(f"[Warning] {error}, only the time is measured.")
+        sampler = None
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+        write_programs(os.path.join(args.output_dir, f"{os.path.basename(os.path.normpath(args.output_dir))}.yaml"),
+                       [Program("python3", ["text_index.py", "parallel_locate", index_filename, args.patterns, "--workers", str(workers),
+                                            "--batch_size", str(args.batch_size)]) for workers in args.workers])
+
+    print("# Workers,Time,QueriesPerSecond,JoulePerQuery,Speedup")
+    single_worker_time = None
+    for i, workers in enumerate(map(int, args.workers)):
+        with ParallelLocator(index_filename, patterns, workers) as locator:
+            runs, occurrences = benchmark_parallel_locate(locator, sampler, int(args.runs), int(args.batch_size))
+        if args.output_dir is not None:
+            write_results(os.path.join(args.output_dir, str(i)), runs)
+        mean_time = np.mean([run.time for run in runs])
+        single_worker_time = mean_time if single_worker_time is None else single_worker_time
+        print(f"{workers},{mean_time},{len(patterns) / mean_time},{np.mean([run.energy for run in runs]) / len(patterns)},{single_worker_time / mean_time}")
+    print(f"{len(patterns)} patterns with {occurrences} occurrences were located {args.runs} times per worker count.")
+
+elif args.mode == "extract":
+    archive_path = split_archive_path(args.text)
+    text_name = os.path.basename(args.text if archive_path is None else archive_path[1] or archive_path[0].removesuffix(".7z"))
+    output_dir = os.path.join("measurements", f"interval_extraction_{text_name}") if args.output_dir is None else args.output_dir
+    experiment = os.path.basename(os.path.normpath(output_dir))
+    os.makedirs(output_dir, exist_ok=True)
+
+    # the yaml is only metadata: it lists one program per index like the other experiments, so the webapp reads the
+    # results with read_experiment (the energy per 1000 queries is 1000 * energy / count). It is not meant to be run
+    # by measure.py, the measurement is done in this process and every program would write the whole experiment again
+    text_args = [args.text, "--count", str(args.count), "--min_length", str(args.min_length), "--max_length", str(args.max_length),
+                 "--seed", str(args.seed), "--batch_size", str(args.batch_size)] + ([] if args.prefix is None else ["--prefix", str(args.prefix)])
+    write_programs(os.path.join(output_dir, f"{experiment}.yaml"),
+                   [Program("python3", ["text_index.py", "extract", *text_args, "--index", kind]) for kind in args.index])
+
+    # the same intervals for every index
+    begins, ends = generate_intervals(text_length(args.text, None if args.prefix is None else int(args.prefix)), int(args.count),
+                                      int(args.min_length), int(args.max_length), int(args.seed))
+
+    try:
+        sampler = EnergySampler(find_domains(args.powercap_dir, args.domain), float(args.interval))
+    except (RuntimeError, OSError) as error:
+        print(f"[Warning] {error}, only the time is measured.")
+        sampler = None
+    for i, kind in enumerate(args.index):
+        start_build = time.perf_counter()
+        extractor = build_extractor(kind, args.text, None if args.prefix is None else int(args.prefix), args.cache_dir, int(args.sample_rate))
+        print(f"The {kind} index (size={extractor.size_in_bytes() / 1e6} MB) was built in {time.perf_counter() - start_build} s.")
+
+        runs = benchmark_extraction(extractor, begins, ends, sampler, int(args.runs), int(args.batch_size))
+        write_results(os.path.join(output_dir, str(i)), runs)
+        time_per_query = np.mean([run.time for run in runs]) / int(args.count)
+        energy_per_query = np.mean([run.energy for run in runs]) / int(args.count)
+        print(f"{args.count} intervals were extracted from the {kind} index {args.runs} times, {time_per_query * 1e6} us and "
+              f"{energy_per_query * 1000} J per 1000 queries, {np.sum(ends - begins) / time_per_query / int(args.count) / 1e6} MB/s.")
+    print(f"The results were written to {output_dir}.")
+
+elif args.mode == "info":
+    print("# Index,Section,Resident,Total")
+    for filename in args.index_files:
+        index_file = IndexFile(filename)
+        for name, (resident, total) in index_file.residency().items():
+            print(f"{filename},{name},{'' if resident is None else resident},{total}")
+        index_file.close()
+
+else:
+    if is_index_file(args.index_or_text):
+        start_load = time.perf_counter()
+        index, index_file = load_index(args.index_or_text)
+        print(f"The {index_file.kind} index was mapped in {time.perf_counter() - start_load} s.")
+    else:
+        index = build_index(args.index_or_text, args.index, int(args.sample_rate), args.prefix, args.cache_dir)
+
+    patterns = load_patterns(args.patterns, args.cache_dir)
+
+    if args.mode == "count":
+        with profile_region("count"):
+            counts = index.count(patterns)
+        print(f"{len(patterns)} patterns were counted in {index.statistics.time_count} s, "
+              f"there are {int(counts.sum())} occurrences in total.")
+    else:
+        with profile_region("locate"):
+            for _ in index.locate(patterns, int(args.batch_size)):
+                pass
+        print(f"{len(patterns)} patterns were located in {index.statistics.time_locate} s, "
+              f"there are {index.statistics.occurrences} occurrences in total.")
+
+    per_query = index.statistics.per_query()
+    print(f"Per query: {per_query['search_steps']:.1f} search steps, {per_query['bytes_touched']:.1f} bytes "
+          f"and at most {per_query['cache_lines_touched']:.1f} cache lines touched.")
+    # in MB like idx_sizes in webapp/energy_efficient_algorithms/compression_emissions.py
+    print(f"The index has a size of {index.size_in_bytes() / 1e6} MB.")
@@ -19,4 +19,7 @@ sites = ["Cache_Misses_are_Energy_Efficient", "Compressed_Text_Indices", "Emissi
 for i, label, site in zip(range(4), labels, sites):
     with cells[i]:
         st.markdown(f'<form action="{site}" method="get"><button class="button-link">{label}</button></form>',
-        unsafe_allow_html=True)
\ No newline at end of file
+        unsafe_allow_html=True)
+
+with st.expander("Cache statistics"):
+    su.show_cache_statistics()
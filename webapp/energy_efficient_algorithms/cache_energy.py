@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+# energy = joule_per_miss * misses + joule_per_instruction * instructions + static_power * time, fitted by least squares
+# over the programs of an experiment that was measured with measure.py --perf_stat
+MISS_COUNTER = "llc-load-misses_mean"
+INSTRUCTION_COUNTER = "instructions_mean"
+
+def has_counters(statistics: pd.DataFrame) -> bool:
+    return all(column in statistics.columns and statistics[column].notna().all() for column in [MISS_COUNTER, INSTRUCTION_COUNTER]) and len(statistics) >= 3
+
+def miss_energy_regression(statistics: pd.DataFrame) -> None | dict[str, float]:
+    # None if the experiment has no hardware counters (perf was not available), then only time and energy are known
+    if not has_counters(statistics):
+        return None
+
+    regressors = statistics[[MISS_COUNTER, INSTRUCTION_COUNTER, "time_mean"]].to_numpy(dtype=float)
+    energy = statistics["energy_mean"].to_numpy(dtype=float)
+    # scale the columns so that the counts (~1e9) and the times (~1e1) are equally weighted by lstsq
+    scale = np.abs(regressors).max(axis=0)
+    scale[scale == 0] = 1
+    coefficients, _, _, _ = np.linalg.lstsq(regressors / scale, energy, rcond=None)
+    coefficients /= scale
+
+    residuals = energy - regressors @ coefficients
+    total = np.sum((energy - energy.mean()) ** 2)
+    return {
+        "joule_per_miss": coefficients[0],
+        "joule_per_instruction": coefficients[1],
+        "static_power": coefficients[2],
+        "r_squared": 1 - np.sum(residuals ** 2) / total if total > 0 else np.nan,
+    }
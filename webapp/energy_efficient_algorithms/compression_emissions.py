@@ -1,3 +1,10 @@
+import numpy as np
+
+from energy_efficient_algorithms.measurements import experiment_statistics
+from energy_efficient_algorithms.measurement_analysis import experiment_analysis
+
+ArrayLike = float | np.ndarray
+
 # all file sizes are given in MB
 file_sizes = {
     "einstein": 629.1,
@@ -21,39 +28,58 @@ query_energy_usage = {
     },
 }
 
-measured_locate_data = {
+# measured means from measurements/, the programs are identified by their args
+locate_args = {
     "einstein": {
         "8": {
-            "eng": {
-                "move-r": 166.96413294474283,
-                "move-r-lzend": 166.59228897094727,
-                "move-r-rlz": 22.553624471028645,
-            },
-            "time": {
-                "move-r": 17.062243166666423,
-                "move-r-lzend": 11.680849649167309,
-                "move-r-rlz": 1.4067980725831148,
-            },
-            "iter": 20_000.0,
+            "move-r": "tmp/einstein.move-r /patterns/einstein_20000_8.patt",
+            "move-r-lzend": "tmp/einstein_lzendsa.move-r /patterns/einstein_20000_8.patt",
+            "move-r-rlz": "tmp/einstein_rlzsa.move-r /patterns/einstein_20000_8.patt",
         }
     }
 }
 
-measured_construction_data = {
+construction_args = {
+    "einstein": {
+        "move-r": "-s locate_move -o tmp/b_einstein -p 1 /texts/einstein",
+        "move-r-lzend": "-s locate_lzendsa -o tmp/b_einstein -p 1 /texts/einstein",
+        "move-r-rlz": "-s locate_rlzsa -o tmp/b_einstein -p 1 /texts/einstein",
+    }
+}
+
+def _measured_means(experiment: str, executable: str, args_per_algo: dict[str, str]) -> dict[str, dict[str, float]]:
+    statistics = experiment_statistics(experiment)
+    return {
+        "eng": {algo: float(statistics.at[(executable, args), "energy_mean"]) for algo, args in args_per_algo.items()},
+        "time": {algo: float(statistics.at[(executable, args), "time_mean"]) for algo, args in args_per_algo.items()},
+    }
+
+def _measured_intervals(experiment: str, executable: str, args_per_algo: dict[str, str]) -> dict[str, dict[str, tuple[float, float]]]:
+    # bootstrap confidence intervals (low, high) of the means, for error bars
+    analysis = experiment_analysis(experiment)
+    return {
+        key: {algo: (float(analysis.at[(executable, args), f"{column}_ci_low"]), float(analysis.at[(executable, args), f"{column}_ci_high"]))
+              for algo, args in args_per_algo.items()}
+        for key, column in [("eng", "energy"), ("time", "time")]
+    }
+
+measured_locate_data = {
     "einstein": {
-        "eng": {
-            "move-r": 301.71971893310547,
-            "move-r-lzend": 6128.963981628418,
-            "move-r-rlz": 443.0567321777344,
-        },
-        "time": {
-            "move-r": 33.42205178999984,
-            "move-r-lzend": 880.8818223425001,
-            "move-r-rlz": 46.35676657699969,
-        },
+        "8": _measured_means("compressed_text_indices_einstein_8", "./bin/move-r-locate", locate_args["einstein"]["8"])
+             | {"iter": 20_000.0},
     }
 }
 
+measured_locate_intervals = {
+    "einstein": {
+        "8": _measured_intervals("compressed_text_indices_einstein_8", "./bin/move-r-locate", locate_args["einstein"]["8"]),
+    }
+}
+
+measured_construction_data = {
+    "einstein": _measured_means("compressed_text_indices_einstein_construct", "./bin/move-r-build", construction_args["einstein"]),
+}
+
 co2_eq_per_kw = 363 # in g
 co2_eq_per_kJ = co2_eq_per_kw / 3600
 co2_eq_per_joule = co2_eq_per_kJ / 1000
@@ -61,16 +87,75 @@ co2_eq_per_joule = co2_eq_per_kJ / 1000
 co2_equiv_per_tb = 209_500 # in g, mean of page 107 GGC Umweltbundesamt
 co2_equiv_per_mb = co2_equiv_per_tb / 1024**2
 
-def disk_co2_emissions(size_in_megabyte: float) -> float:
-    return size_in_megabyte * co2_equiv_per_mb
+# all functions broadcast over numpy arrays (or lists) of sizes, query counts and energy values
 
-def query_co2_emissions(count_queries: int, joule_per_1000_queries: float) -> float:
-    return (count_queries / 1000) * joule_per_1000_queries * co2_eq_per_joule
+def disk_co2_emissions(size_in_megabyte: ArrayLike) -> ArrayLike:
+    return np.asarray(size_in_megabyte) * co2_equiv_per_mb
 
-def joule_to_co2(energy_in_joule: float) -> float:
-    return energy_in_joule * co2_eq_per_joule
+def query_co2_emissions(count_queries: ArrayLike, joule_per_1000_queries: ArrayLike) -> ArrayLike:
+    return (np.asarray(count_queries) / 1000) * np.asarray(joule_per_1000_queries) * co2_eq_per_joule
 
-def all_co2_emissions(size_in_megabyte: float, construction_energy: float, joule_per_query, count_queries: int) -> float: # returns in g co2 eq
+def joule_to_co2(energy_in_joule: ArrayLike) -> ArrayLike:
+    return np.asarray(energy_in_joule) * co2_eq_per_joule
+
+DAYS_PER_YEAR = 365
+# the cost of an incremental rebuild relative to a full construction of the same number of megabytes, fitted to the
+# MergeStatistics of text_index.py append on einstein (2 and 8 MB with 20 KB to 400 KB appended, 2.6 s per MB for a
+# full construction): sorting and ranking the appended text, and the scans of the existing text and suffix array
+INCREMENTAL_APPEND_COST = 1.8
+INCREMENTAL_MERGE_COST = 0.03
+# only the suffix array of text_index.py can be appended to, the move-r indices are always rebuilt
+INCREMENTAL_INDICES = ["sa"]
+
+def yearly_construction_energy(construction_energy: ArrayLike, text_size_in_megabyte: None | ArrayLike = None, appends_per_day: ArrayLike = 0.0,
+                               megabyte_per_append: ArrayLike = 0.0, incremental: bool = False) -> ArrayLike:
+    # the initial construction plus one rebuild per append during one year, in Joule. The construction energy is assumed
+    # to grow linearly with the text: a full rebuild indexes the whole grown text again, an incremental rebuild
+    # (text_index.py append) sorts the appended bytes and merges them into the existing suffix array, which costs
+    # INCREMENTAL_MERGE_COST per megabyte of the existing text
+    construction_energy = np.asarray(construction_energy, dtype=float)
+    appends = np.asarray(appends_per_day, dtype=float) * DAYS_PER_YEAR
+    if not np.any(appends > 0):
+        return construction_energy
+    if text_size_in_megabyte is None:
+        raise ValueError("the construction energy per megabyte of the rebuilds needs the text size")
+    text_size_in_megabyte = np.asarray(text_size_in_megabyte, dtype=float)
+    joule_per_megabyte = construction_energy / text_size_in_megabyte
+    megabyte_per_append = np.asarray(megabyte_per_append, dtype=float)
+    if incremental:
+        # the k-th rebuild merges into text_size + (k - 1) * megabyte_per_append
+        existing_megabyte = appends * text_size_in_megabyte + megabyte_per_append * appends * (appends - 1) / 2
+        rebuilt_megabyte = INCREMENTAL_APPEND_COST * appends * megabyte_per_append + INCREMENTAL_MERGE_COST * existing_megabyte
+    else:
+        # the k-th rebuild indexes text_size + k * megabyte_per_append
+        rebuilt_megabyte = appends * text_size_in_megabyte + megabyte_per_append * appends * (appends + 1) / 2
+    return construction_energy + joule_per_megabyte * rebuilt_megabyte
+
+def all_co2_emissions(size_in_megabyte: ArrayLike, construction_energy: ArrayLike, joule_per_query: ArrayLike, count_queries: ArrayLike,
+                      text_size_in_megabyte: None | ArrayLike = None, appends_per_day: ArrayLike = 0.0, megabyte_per_append: ArrayLike = 0.0,
+                      incremental: bool = False) -> ArrayLike: # returns in g co2 eq
     return (disk_co2_emissions(size_in_megabyte)
-            + joule_to_co2(construction_energy)
-            + joule_to_co2(joule_per_query * count_queries))
+            + joule_to_co2(yearly_construction_energy(construction_energy, text_size_in_megabyte, appends_per_day, megabyte_per_append, incremental))
+            + joule_to_co2(np.asarray(joule_per_query) * np.asarray(count_queries)))
+
+EMISSION_COMPONENTS = ("storage", "construction", "queries")
+
+def co2_emissions_grid(size_in_megabyte: ArrayLike, construction_energy: ArrayLike, joule_per_query: ArrayLike, count_queries: ArrayLike,
+                       text_size_in_megabyte: None | ArrayLike = None, appends_per_day: ArrayLike = 0.0, megabyte_per_append: ArrayLike = 0.0,
+                       incremental: bool = False) -> np.ndarray:
+    # one entry per index (first three arguments) and query count, returns in g co2 eq
+    # with the shape (indices, query counts, components), the components are in the order of EMISSION_COMPONENTS;
+    # with appends the construction component contains the rebuilds of one year, see yearly_construction_energy
+    construction_energy = yearly_construction_energy(construction_energy, text_size_in_megabyte, appends_per_day, megabyte_per_append, incremental)
+    size_in_megabyte, construction_energy, joule_per_query = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(size_in_megabyte, dtype=float)),
+        np.atleast_1d(np.asarray(construction_energy, dtype=float)),
+        np.atleast_1d(np.asarray(joule_per_query, dtype=float)),
+    )
+    count_queries = np.atleast_1d(np.asarray(count_queries, dtype=float))
+
+    grid = np.empty((len(size_in_megabyte), len(count_queries), len(EMISSION_COMPONENTS)))
+    grid[:, :, 0] = disk_co2_emissions(size_in_megabyte)[:, None]
+    grid[:, :, 1] = joule_to_co2(construction_energy)[:, None]
+    grid[:, :, 2] = joule_to_co2(np.multiply.outer(joule_per_query, count_queries))
+    return grid
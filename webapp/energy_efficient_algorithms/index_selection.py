@@ -0,0 +1,126 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+import energy_efficient_algorithms.compression_emissions as compr
+
+# every index is modelled as a line: cost(queries) = fixed + per_query * queries, where fixed contains
+# the construction (and storage) cost; the cost can be energy in Joule or emissions in g co2 eq
+
+def index_costs(filename: str, algos: list[str], pattern_length: str = "8") -> tuple[np.ndarray, np.ndarray]:
+    # the fixed and per query emissions in g co2 eq of the measured indices
+    locate_data = compr.measured_locate_data[filename][pattern_length]
+    fixed = (compr.disk_co2_emissions([compr.idx_sizes[filename][algo] for algo in algos])
+             + compr.joule_to_co2([compr.measured_construction_data[filename]["eng"][algo] for algo in algos]))
+    per_query = compr.joule_to_co2([locate_data["eng"][algo] / locate_data["iter"] for algo in algos])
+    return fixed, per_query
+
+def break_even_queries(fixed_a, per_query_a, fixed_b, per_query_b) -> np.ndarray:
+    # the query count where both indices cost the same, nan if the costs never cross for a positive query count
+    fixed_a, per_query_a, fixed_b, per_query_b = map(np.asarray, (fixed_a, per_query_a, fixed_b, per_query_b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        queries = (fixed_b - fixed_a) / (per_query_a - per_query_b)
+    return np.where(np.isfinite(queries) & (queries > 0), queries, np.nan)[()]
+
+def break_even_matrix(fixed, per_query) -> np.ndarray:
+    # entry (i, j) is the break-even query count of the indices i and j
+    fixed = np.asarray(fixed, dtype=float)
+    per_query = np.asarray(per_query, dtype=float)
+    return break_even_queries(fixed[:, None], per_query[:, None], fixed[None, :], per_query[None, :])
+
+def cheapest_index(fixed, per_query, count_queries) -> np.ndarray:
+    # the index with the lowest cost for every query count
+    costs = np.asarray(fixed, dtype=float)[:, None] + np.multiply.outer(np.asarray(per_query, dtype=float), np.atleast_1d(count_queries))
+    return np.argmin(costs, axis=0)
+
+def optimal_index_intervals(fixed, per_query) -> list[tuple[int, float, float]]:
+    # the lower envelope of all cost lines (convex hull trick, O(k log k)) restricted to queries >= 0,
+    # returns a list of (index, from queries, to queries) in increasing query order
+    fixed = np.asarray(fixed, dtype=float)
+    per_query = np.asarray(per_query, dtype=float)
+
+    hull: list[int] = []
+    starts: list[float] = []
+    # decreasing slope, for equal slopes only the first (smallest fixed cost) line can be on the envelope
+    for i in np.lexsort((fixed, -per_query)):
+        if hull and per_query[hull[-1]] == per_query[i]:
+            continue
+        start = -np.inf
+        while hull:
+            start = (fixed[i] - fixed[hull[-1]]) / (per_query[hull[-1]] - per_query[i])
+            if start > starts[-1]:
+                break
+            # the new line is cheaper on the whole segment of the last line
+            hull.pop()
+            starts.pop()
+            start = -np.inf
+        hull.append(int(i))
+        starts.append(start)
+
+    ends = starts[1:] + [np.inf]
+    return [(i, max(float(start), 0.0), float(end)) for i, start, end in zip(hull, starts, ends) if end > 0]
+
+def pareto_front(points) -> np.ndarray:
+    # points has one row per index and one column per objective (e.g. size, time, energy), all are minimized;
+    # returns a mask of the pareto-optimal rows
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 2 and points.shape[1] == 2:
+        return _pareto_front_2d(points)
+    if points.ndim == 2 and points.shape[1] == 3:
+        return _pareto_front_3d(points)
+    is_optimal = np.zeros(len(points), dtype=bool)
+
+    # in lexicographic order no point can be dominated by a later one, so every point is only compared to the front
+    front = np.empty_like(points)
+    front_size = 0
+    for i in np.lexsort(points.T[::-1]):
+        point = points[i]
+        candidates = front[:front_size]
+        dominated = np.any(np.all(candidates <= point, axis=1) & np.any(candidates < point, axis=1))
+        if not dominated:
+            is_optimal[i] = True
+            front[front_size] = point
+            front_size += 1
+
+    return is_optimal
+
+def _pareto_front_2d(points: np.ndarray) -> np.ndarray:
+    # O(n log n): sorted by the first and then the second objective, a point is dominated by a point with a smaller
+    # first objective and a second one that is not larger (the running minimum before its group of equal first
+    # objectives), or by the first point of its group if that has a smaller second objective; duplicates stay optimal
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    first, second = points[order, 0], points[order, 1]
+    group_start = np.searchsorted(first, first, side="left")
+    running_min = np.concatenate([[np.inf], np.minimum.accumulate(second)])
+    dominated = (running_min[group_start] <= second) | (second[group_start] < second)
+    is_optimal = np.zeros(len(points), dtype=bool)
+    is_optimal[order] = ~dominated
+    return is_optimal
+
+def _pareto_front_3d(points: np.ndarray) -> np.ndarray:
+    # O(n log n) sweep in lexicographic order: the staircase holds the (second, third) objectives of the front so far
+    # that are not dominated by each other, with the second objective increasing and the third one decreasing. The
+    # last stair with a second objective that is not larger has the smallest third one, a point is dominated if that
+    # is not larger either, unless the stair is a duplicate of the point (same first objective)
+    stair_second: list[float] = []
+    stair_third: list[float] = []
+    stair_first: list[float] = [] # the first objective of the earliest point of every stair
+    is_optimal = np.zeros(len(points), dtype=bool)
+    for i in np.lexsort(points.T[::-1]).tolist():
+        first, second, third = points[i].tolist()
+        stair = bisect_right(stair_second, second) - 1
+        if stair >= 0 and stair_third[stair] <= third and \
+                (stair_third[stair] < third or stair_second[stair] < second or stair_first[stair] < first):
+            continue
+        is_optimal[i] = True
+        # the point replaces the stairs from its position on with a third objective that is not smaller (a duplicate
+        # replaces its own stair)
+        start = bisect_left(stair_second, second)
+        end = start
+        while end < len(stair_third) and stair_third[end] >= third:
+            end += 1
+        stair_second[start:end] = [second]
+        stair_third[start:end] = [third]
+        stair_first[start:end] = [first]
+
+    return is_optimal
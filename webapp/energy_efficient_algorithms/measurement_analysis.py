@@ -0,0 +1,114 @@
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from energy_efficient_algorithms.measurements import KEY_COLUMNS, MEASUREMENTS_DIR, _signature, load_measurements
+
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+# runs with a modified z-score (median and MAD based) above this threshold are outliers, see Iglewicz and Hoaglin
+OUTLIER_THRESHOLD = 3.5
+# relative width of the confidence interval (relative to the mean) that required_repetitions aims for
+TARGET_RELATIVE_WIDTH = 0.02
+
+# all functions work on (configurations, runs) matrices where configurations with fewer runs are padded with nan,
+# so that all experiments are analyzed at once
+
+def sample_matrix(results: pd.DataFrame, column: str) -> tuple[pd.DataFrame, np.ndarray]:
+    # the keys of all configurations and the padded matrix of their runs
+    results = results.sort_values(KEY_COLUMNS + ["run"])
+    groups = results.groupby(KEY_COLUMNS, sort=False)
+    keys = groups.size().reset_index(name="runs")
+    position = groups.cumcount().to_numpy()
+    configuration = groups.ngroup().to_numpy()
+
+    matrix = np.full((len(keys), keys["runs"].max() if len(keys) > 0 else 0), np.nan)
+    matrix[configuration, position] = results[column].to_numpy(dtype=float)
+    return keys, matrix
+
+def outlier_mask(matrix: np.ndarray, threshold: float = OUTLIER_THRESHOLD) -> np.ndarray:
+    median = np.nanmedian(matrix, axis=1, keepdims=True)
+    mad = np.nanmedian(np.abs(matrix - median), axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = 0.6745 * np.abs(matrix - median) / mad
+    return np.nan_to_num(z, nan=0.0) > threshold
+
+def warmup_runs(outliers: np.ndarray) -> np.ndarray:
+    # number of leading outliers of every configuration, e.g. the first run with cold caches
+    return np.argmin(np.concatenate([outliers, np.zeros((len(outliers), 1), dtype=bool)], axis=1), axis=1)
+
+def drop_warmup(matrix: np.ndarray, warmup: np.ndarray) -> np.ndarray:
+    return np.where(np.arange(matrix.shape[1]) < warmup[:, None], np.nan, matrix)
+
+def bootstrap_ci(matrix: np.ndarray, confidence: float = CONFIDENCE, resamples: int = BOOTSTRAP_RESAMPLES,
+                 seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # percentile bootstrap of the mean; every configuration resamples only from its own (non nan) runs,
+    # configurations with the same number of runs are resampled together
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=1)
+    # move the valid runs to the front so that a resampled position can be drawn uniformly from [0, count)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    packed = np.take_along_axis(matrix, order, axis=1)
+
+    rng = np.random.default_rng(seed)
+    means = np.full((len(matrix), resamples), np.nan)
+    for count in np.unique(counts[counts > 0]):
+        rows = np.flatnonzero(counts == count)
+        draws = rng.integers(0, count, size=(len(rows), resamples, count), dtype=np.int32)
+        means[rows] = np.take_along_axis(packed[rows, None, :count], draws, axis=2).mean(axis=2)
+
+    alpha = (1 - confidence) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lower, upper = np.quantile(means, [alpha, 1 - alpha], axis=1)
+        return np.nansum(matrix, axis=1) / counts, lower, upper
+
+def required_repetitions(matrix: np.ndarray, target_relative_width: float = TARGET_RELATIVE_WIDTH,
+                         confidence: float = CONFIDENCE) -> np.ndarray:
+    # runs such that the normal confidence interval of the mean is at most target_relative_width * mean wide
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        runs = (2 * z * np.nanstd(matrix, axis=1, ddof=1) / (target_relative_width * np.abs(np.nanmean(matrix, axis=1)))) ** 2
+    return np.ceil(np.nan_to_num(runs, nan=0.0, posinf=0.0)).astype(int)
+
+def analyze_results(results: pd.DataFrame, columns: tuple[str, ...] = ("time", "energy"), confidence: float = CONFIDENCE,
+                    resamples: int = BOOTSTRAP_RESAMPLES, target_relative_width: float = TARGET_RELATIVE_WIDTH) -> pd.DataFrame:
+    # one row per configuration with <column>_mean, _ci_low, _ci_high, _outliers, _warmup and _required_runs,
+    # leading outliers (warm-up runs) are excluded from the mean, the interval and the required runs
+    analysis = None
+    for column in columns:
+        keys, matrix = sample_matrix(results, column)
+        outliers = outlier_mask(matrix)
+        warmup = warmup_runs(outliers)
+        matrix = drop_warmup(matrix, warmup)
+        mean, lower, upper = bootstrap_ci(matrix, confidence, resamples)
+
+        if analysis is None:
+            analysis = keys
+        analysis[f"{column}_mean"] = mean
+        analysis[f"{column}_ci_low"] = lower
+        analysis[f"{column}_ci_high"] = upper
+        analysis[f"{column}_outliers"] = outliers.sum(axis=1)
+        analysis[f"{column}_warmup"] = warmup
+        analysis[f"{column}_required_runs"] = required_repetitions(matrix, target_relative_width, confidence)
+    return analysis
+
+@lru_cache(maxsize=4)
+def _analyze_measurements(measurements_dir: str, signature: tuple) -> pd.DataFrame:
+    results, _ = load_measurements(measurements_dir)
+    return analyze_results(results)
+
+def experiment_analysis(experiment: str, measurements_dir: str = MEASUREMENTS_DIR) -> pd.DataFrame:
+    # the analysis of one experiment keyed by (executable, args) like experiment_statistics
+    analysis = _analyze_measurements(measurements_dir, _signature(measurements_dir))
+    return analysis[analysis["experiment"] == experiment].set_index(["executable", "args"])
+
+if __name__ == "__main__":
+    import time
+
+    results, _ = load_measurements()
+    start = time.perf_counter()
+    analysis = analyze_results(results)
+    print(analysis.drop(columns=["executable"]).to_string())
+    print(f"{len(analysis)} configurations were analyzed in {time.perf_counter() - start} s.")
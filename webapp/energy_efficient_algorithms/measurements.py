@@ -0,0 +1,123 @@
+import os
+import pickle
+from functools import lru_cache
+
+import pandas as pd
+import yaml
+
+MEASUREMENTS_DIR = "measurements"
+CACHE_FILENAME = "tmp/measurements_cache.pkl"
+KEY_COLUMNS = ["experiment", "program", "executable", "args", "input"]
+
+# every experiment is a directory measurements/<experiment> with the file <experiment>.yaml,
+# the results of the i-th program of the yaml are in the numbered directory <experiment>/<i>
+
+def _measurement_files(measurements_dir: str) -> list[str]:
+    files = []
+    for root, _, filenames in os.walk(measurements_dir):
+        files.extend(os.path.join(root, filename) for filename in filenames if filename.endswith((".yaml", ".csv")))
+    return sorted(files)
+
+def _signature(measurements_dir: str) -> tuple[tuple[str, int], ...]:
+    return tuple((filename, os.stat(filename).st_mtime_ns) for filename in _measurement_files(measurements_dir))
+
+def _read_csv(filename: str) -> pd.DataFrame:
+    # the header line looks like "# Time,Energy"
+    table = pd.read_csv(filename)
+    table.columns = [column.removeprefix("#").strip().lower() for column in table.columns]
+    return table
+
+def read_experiment(experiment_dir: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # returns the results (one row per run) and the statistics (one row per program) of one experiment
+    experiment = os.path.basename(os.path.normpath(experiment_dir))
+    with open(os.path.join(experiment_dir, f"{experiment}.yaml"), "r") as experiment_file:
+        programs = yaml.safe_load(experiment_file)["programs"]
+
+    results = []
+    statistics = []
+    for i, program in enumerate(programs):
+        program_dir = os.path.join(experiment_dir, str(i))
+        if not os.path.isdir(program_dir):
+            continue
+
+        key = {
+            "experiment": experiment,
+            "program": i,
+            "executable": program["executeable"],
+            "args": " ".join(map(str, program["args"])),
+            "input": program.get("input", ""),
+        }
+
+        program_results = _read_csv(os.path.join(program_dir, "results.csv"))
+        program_results.insert(0, "run", range(len(program_results)))
+
+        program_statistics = _read_csv(os.path.join(program_dir, "statistics.csv")).set_index("value")
+        row = dict(key)
+        for value in program_statistics.index:
+            for column in program_statistics.columns:
+                row[f"{column}_{value}"] = program_statistics.at[value, column]
+
+        # hardware counters of measure.py --perf_stat (one row per run), e.g. llc-load-misses_mean
+        counters_filename = os.path.join(program_dir, "counters.csv")
+        if os.path.exists(counters_filename):
+            program_counters = _read_csv(counters_filename)
+            program_results = pd.concat([program_results, program_counters], axis=1)
+            for column in program_counters.columns:
+                row[f"{column}_mean"] = program_counters[column].mean()
+
+        results.append(program_results.assign(**key))
+        statistics.append(row)
+
+    if len(results) == 0:
+        # the experiment was not run yet
+        return pd.DataFrame(columns=KEY_COLUMNS), pd.DataFrame(columns=KEY_COLUMNS)
+
+    results_table = pd.concat(results, ignore_index=True)
+    results_table = results_table[KEY_COLUMNS + [column for column in results_table.columns if column not in KEY_COLUMNS]]
+    return results_table, pd.DataFrame(statistics)
+
+@lru_cache(maxsize=4)
+def _load_measurements(measurements_dir: str, cache_filename: str, signature: tuple) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if os.path.exists(cache_filename):
+        try:
+            with open(cache_filename, "rb") as cache_file:
+                cached = pickle.load(cache_file)
+            if cached["signature"] == signature and cached["pandas_version"] == pd.__version__:
+                return cached["results"], cached["statistics"]
+        except Exception:
+            pass # unreadable caches (e.g. written by another pandas version) are rebuilt
+
+    results = []
+    statistics = []
+    for experiment in sorted(os.listdir(measurements_dir)):
+        experiment_dir = os.path.join(measurements_dir, experiment)
+        if os.path.isfile(os.path.join(experiment_dir, f"{experiment}.yaml")):
+            experiment_results, experiment_statistics = read_experiment(experiment_dir)
+            if len(experiment_results) > 0:
+                results.append(experiment_results)
+                statistics.append(experiment_statistics)
+
+    results_table = pd.concat(results, ignore_index=True)
+    statistics_table = pd.concat(statistics, ignore_index=True)
+
+    try:
+        with open(cache_filename, "wb") as cache_file:
+            pickle.dump({"signature": signature, "pandas_version": pd.__version__, "results": results_table, "statistics": statistics_table}, cache_file)
+    except OSError:
+        pass # the cache is optional, e.g. on a read-only deployment
+
+    return results_table, statistics_table
+
+def load_measurements(measurements_dir: str = MEASUREMENTS_DIR, cache_filename: str = CACHE_FILENAME) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # the tables are memoized and cached on disk, both are invalidated as soon as a measurement file changes
+    return _load_measurements(measurements_dir, cache_filename, _signature(measurements_dir))
+
+def experiment_statistics(experiment: str, measurements_dir: str = MEASUREMENTS_DIR) -> pd.DataFrame:
+    # the statistics of one experiment keyed by (executable, args)
+    _, statistics = load_measurements(measurements_dir)
+    return statistics[statistics["experiment"] == experiment].set_index(["executable", "args"])
+
+if __name__ == "__main__":
+    results, statistics = load_measurements()
+    print(results)
+    print(statistics)
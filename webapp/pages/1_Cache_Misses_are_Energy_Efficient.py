@@ -1,8 +1,10 @@
 import streamlit as st
 import shared.streamlit_utils as su
-import plotly.express as px
 from shared.references import References
 from shared.common_text import EXPERIMENT_SYSTEM_TEXT
+from energy_efficient_algorithms.measurements import experiment_statistics
+from energy_efficient_algorithms.measurement_analysis import experiment_analysis
+from energy_efficient_algorithms.cache_energy import miss_energy_regression
 
 ########## Data section start ##########
 measured_data = {
@@ -39,6 +41,24 @@ measured_data = {
 }
 keys_sorted = measured_data.keys()
 
+# prefer the measurements of measurements/cache_efficiency (the programs are in the order of keys_sorted) if they were run
+for program in experiment_statistics("cache_efficiency").itertuples():
+    key = list(keys_sorted)[program.program]
+    measured_data[key]["eng"] = program.energy_mean
+    measured_data[key]["time"] = program.time_mean
+
+# bootstrap confidence intervals of the measured programs for the error bars of figures 1 and 2
+for program in experiment_analysis("cache_efficiency").itertuples():
+    key = list(keys_sorted)[program.program]
+    measured_data[key]["eng_ci"] = (program.energy_ci_low, program.energy_ci_high)
+    measured_data[key]["time_ci"] = (program.time_ci_low, program.time_ci_high)
+
+def per_access_intervals(column: str) -> tuple[None | tuple, None | tuple]:
+    # in nano units per access like the bars, None if not all programs were measured
+    if not all(column in measured_data[key] for key in keys_sorted):
+        return None, None
+    return tuple(tuple(measured_data[key][column][bound] / measured_data[key]["iter"] * 1e9 for key in keys_sorted) for bound in [0, 1])
+
 for key in measured_data.keys():
     measured_data[key]["joule_per_access"] = measured_data[key]["eng"] / measured_data[key]["iter"]
     measured_data[key]["second_per_access"] = measured_data[key]["time"] / measured_data[key]["iter"]
@@ -60,6 +80,12 @@ second_per_cache_miss = time_chase / accesses_chase # 4.694784307908429e-09
 
 energy_per_second_cache_hits = energy_hits / time_hits # 11.316670259711712
 energy_per_second_cache_misses = energy_chase / time_chase # 7.713548991999147
+
+# the values above assume that every access of the chase is a miss; with hardware counters
+# (python measure.py --perf_stat) the energy per miss is regressed from the measured miss counts instead
+miss_regression = miss_energy_regression(experiment_statistics("cache_efficiency"))
+if miss_regression is not None:
+    joule_per_cache_miss = miss_regression["joule_per_miss"]
 ########### Data section end ###########
 
 references = References()
@@ -120,6 +146,13 @@ st.write("The energy per time ratio is the highest with {:.2f} J/s if we only ac
 
 middle_bar_chart = st.columns([1, 2, 1])
 
+if miss_regression is not None:
+    st.write("Dividing the energy by the number of accesses assumes that every access is a cache miss. "
+             "With the measured last level cache misses and instructions of all runs, a least squares fit attributes "
+             "{:.2f} nJ to one cache miss, {:.3f} nJ to one instruction and {:.2f} W of static power (R² = {:.3f}).".format(
+                 miss_regression["joule_per_miss"] * 1e9, miss_regression["joule_per_instruction"] * 1e9,
+                 miss_regression["static_power"], miss_regression["r_squared"]))
+
 st.write("## Conclusions")
 st.write("The experiments clearly show that runtime is not a reliable proxy for energy usage if the cache efficiency is different. "
          "Further, it shows that programs with more cache misses can be used to reduce the energy consumption if they achieve similar runtime performance. "
@@ -134,42 +167,35 @@ st.write(references.make_references_section())
 
 # run-time heavy computation at the end
 with row_bar_charts[0]:
-    fig = px.bar(
-        x=keys_sorted,
-        y=[measured_data[key]["second_per_access"] * 1e9 for key in keys_sorted],
-        height=500,
-        labels={
-            "x": "Algorithm",
-            "y": "Time for one query [ns]"
-        }
+    fig = su.create_bar_chart(
+        tuple(keys_sorted),
+        tuple([measured_data[key]["second_per_access"] * 1e9 for key in keys_sorted]),
+        "Algorithm",
+        "Time for one query [ns]",
+        *per_access_intervals("time_ci")
     )
 
     st.plotly_chart(fig, width='content')
     st.caption("Figure 1: TODO.")
 
 with row_bar_charts[1]:
-    fig = px.bar(
-        x=keys_sorted,
-        y=[measured_data[key]["joule_per_access"] * 1e9 for key in keys_sorted],
-        height=500,
-        labels={
-            "x": "Algorithm",
-            "y": "Energy for one access [nJ]"
-        }
+    fig = su.create_bar_chart(
+        tuple(keys_sorted),
+        tuple([measured_data[key]["joule_per_access"] * 1e9 for key in keys_sorted]),
+        "Algorithm",
+        "Energy for one access [nJ]",
+        *per_access_intervals("eng_ci")
     )
 
     st.plotly_chart(fig, width='content')
     st.caption("Figure 2: TODO.")
 
 with middle_bar_chart[1]:
-    fig = px.bar(
-        x=keys_sorted,
-        y=[measured_data[key]["eng_per_second"] for key in keys_sorted],
-        height=500,
-        labels={
-            "x": "Algorithm",
-            "y": "Energy per time [J/s]"
-        }
+    fig = su.create_bar_chart(
+        tuple(keys_sorted),
+        tuple([measured_data[key]["eng_per_second"] for key in keys_sorted]),
+        "Algorithm",
+        "Energy per time [J/s]"
     )
 
     st.plotly_chart(fig, width='content')
@@ -1,12 +1,14 @@
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import pandas as pd
+import numpy as np
 import streamlit as st
-import plotly.express as px
 
 import shared.streamlit_utils as su
 from shared.references import References
+from shared.caching import cache_data
 from shared.common_text import EXPERIMENT_SYSTEM_TEXT
 import energy_efficient_algorithms.compression_emissions as compr
+import energy_efficient_algorithms.index_selection as isel
 
 
 references = References()
@@ -93,9 +95,14 @@ st.image("webapp/static/compressed_text_indices_einstein_construct.png", caption
 
 st.write("### Adding construction and query costs together")
 
+locate_data = compr.measured_locate_data["einstein"]["8"]
+construction_break_even = isel.break_even_queries(
+    compr.measured_construction_data["einstein"]["eng"]["move-r"], locate_data["eng"]["move-r"] / locate_data["iter"],
+    compr.measured_construction_data["einstein"]["eng"]["move-r-rlz"], locate_data["eng"]["move-r-rlz"] / locate_data["iter"]
+)
 st.write("Let's take a look at the combination of construction costs and costs for locate queries. "
-         f"The energy usage, dependent on the number of locate queries executed, is visualized in figure {references.ref_figure('cmb')}. "
-         f"If one executes up to approximately 20,000 locate queries, then the construction costs outweigh, and move-r is the most energy-efficient choice. "
+         f"The energy usage, dependent on the number of locate queries executed, is visualized in figure {references.ref_figure('cmb')}. " +
+         "If one executes up to approximately {:,.0f} locate queries, then the construction costs outweigh, and move-r is the most energy-efficient choice. ".format(round(construction_break_even, -3)) +
          f"For more queries, move-r-rlz becomes the most energy-efficient index. "
          f"Note that we excluded the compression ratio in this figure again. These three factors will be merged on the following page.")
 
@@ -115,59 +122,89 @@ st.write(references.make_references_section())
 
 # run-time heavy loading at the end
 used_algos = ["move-r", "move-r-lzend", "move-r-rlz"]
+
+def create_size_scatter_plot(y: tuple, y_label: str, y_lim_max: int, y_intervals: None | tuple = None):
+    fig = Figure()
+    ax = fig.subplots()
+
+    x = [compr.idx_sizes["einstein"][algo] for algo in used_algos]
+
+    if y_intervals is not None:
+        # 95% bootstrap confidence intervals of the means
+        y_err = np.maximum([[y[j] - y_intervals[j][0] for j in range(len(y))], [y_intervals[j][1] - y[j] for j in range(len(y))]], 0)
+        ax.errorbar(x, y, yerr=y_err, fmt="none", ecolor="black", capsize=4, zorder=3)
+
+    ax.scatter(x[0], y[0], s=120, color="#009E73", marker="s")
+    ax.scatter(x[1], y[1], s=120, color="#0072B2", marker="^")
+    ax.scatter(x[2], y[2], s=120, color="#E69F00", marker="o")
+
+    ax.set_xlim(0, 60)
+    ax.set_ylim(0, y_lim_max)
+
+    ax.grid(False)
+
+    ax.set_xlabel("Size of compressed text index [MB]")
+    ax.set_ylabel(y_label)
+
+    for j, offset in enumerate([(-35, 12), (-15, -22), (-25, 10)]):
+        ax.annotate(used_algos[j], (x[j], y[j]), xytext=offset, textcoords="offset points", fontsize=12)
+
+    return fig
+
+@cache_data
+def construction_energy_series() -> list[pd.Series]:
+    coordinates = 2_000 * np.arange(1, 1000)
+
+    return [pd.Series(
+        compr.measured_construction_data["einstein"]["eng"][key] + (compr.measured_locate_data["einstein"]["8"]["eng"][key] / 20_000) * coordinates,
+        index=coordinates,
+        name=key
+    ) for key in used_algos]
+
+def create_construction_plot(log_scale: bool):
+    fig = Figure()
+    ax = fig.subplots()
+
+    for series, color in zip(construction_energy_series(), ["#009E73", "#0072B2", "#E69F00"]):
+        series.plot(ax=ax, marker=None, color=color, logy=log_scale, logx=log_scale)
+
+    ax.set_xlabel("Queries")
+    ax.set_ylabel("Energy usage locate queries + construction [J]")
+    ax.legend()
+
+    return fig
+
 with row_2[1]:
-    fig = px.bar(
-        x=used_algos,
-        y=[compr.measured_locate_data["einstein"]["8"]["eng"][algo] / compr.measured_locate_data["einstein"]["8"]["time"][algo] for algo in used_algos],
-        height=500,
-        labels={
-            "x": "Algorithm - locate",
-            "y": "Energy per time [J/s]"
-        }
+    fig = su.create_bar_chart(
+        tuple(used_algos),
+        tuple([compr.measured_locate_data["einstein"]["8"]["eng"][algo] / compr.measured_locate_data["einstein"]["8"]["time"][algo] for algo in used_algos]),
+        "Algorithm - locate",
+        "Energy per time [J/s]"
     )
 
     st.plotly_chart(fig, width='content')
     st.caption(f"Figure {references.ref_figure('loc_eng_per_time')}")
 
 with row_3[1]:
-    fig = px.bar(
-        x=used_algos,
-        y=[compr.idx_sizes["einstein"][algo] for algo in used_algos],
-        height=500,
-        labels={
-            "x": "Algorithm - locate",
-            "y": "Size of the compressed text index [MB]"
-        }
+    fig = su.create_bar_chart(
+        tuple(used_algos),
+        tuple([compr.idx_sizes["einstein"][algo] for algo in used_algos]),
+        "Algorithm - locate",
+        "Size of the compressed text index [MB]"
     )
 
     st.plotly_chart(fig, width='content')
     st.caption(f"Figure {references.ref_figure('size')}: The original file has a size of {compr.file_sizes['einstein']} MB.")
 
-for y, y_label, i, y_lim_max, fig_label in zip([[compr.measured_locate_data["einstein"]["8"]["time"][algo] for algo in used_algos],
-                            [compr.measured_locate_data["einstein"]["8"]["eng"][algo] for algo in used_algos]],
+for key, y_label, i, y_lim_max, fig_label in zip(["time", "eng"],
                             ["Runtime [s]", "Energy [J]"],
                             [0, 1],
                             [20, 200],
                             ['size_time', 'size_eng']):
     with row_4[i]:
-        fig, ax = plt.subplots()
-
-        x = [compr.idx_sizes["einstein"][algo] for algo in used_algos]
-
-        ax.scatter(x[0], y[0], s=120, color="#009E73", marker="s")
-        ax.scatter(x[1], y[1], s=120, color="#0072B2", marker="^")
-        ax.scatter(x[2], y[2], s=120, color="#E69F00", marker="o")
-
-        ax.set_xlim(0, 60)
-        ax.set_ylim(0, y_lim_max)
-
-        ax.grid(False)
-
-        ax.set_xlabel("Size of compressed text index [MB]")
-        ax.set_ylabel(y_label)
-
-        for j, offset in enumerate([(-35, 12), (-15, -22), (-25, 10)]):
-            ax.annotate(used_algos[j], (x[j], y[j]), xytext=offset, textcoords="offset points", fontsize=12)
+        y = tuple(compr.measured_locate_data["einstein"]["8"][key][algo] for algo in used_algos)
+        y_intervals = tuple(compr.measured_locate_intervals["einstein"]["8"][key][algo] for algo in used_algos)
+        fig = create_size_scatter_plot(y, y_label, y_lim_max, y_intervals)
 
         st.pyplot(fig)
         st.caption(f"Figure {references.ref_figure(fig_label)}")
@@ -175,22 +212,7 @@ for y, y_label, i, y_lim_max, fig_label in zip([[compr.measured_locate_data["ein
 with row_construction[1]:
     log_scale = st.toggle("Logarithmic scale", value=True)
 
-    coordinates = [2_000 * i for i in range(1, 1000)]
-
-    energy_usage_series = [pd.Series(
-        [compr.measured_construction_data["einstein"]["eng"][key] + (compr.measured_locate_data["einstein"]["8"]["eng"][key] / 20_000) * c for c in coordinates],
-        index=coordinates,
-        name=key
-    ) for key in used_algos]
-
-    fig, ax = plt.subplots()
-
-    for series, color in zip(energy_usage_series, ["#009E73", "#0072B2", "#E69F00"]):
-        series.plot(ax=ax, marker=None, color=color, logy=log_scale, logx=log_scale)
-
-    ax.set_xlabel("Queries")
-    ax.set_ylabel("Energy usage locate queries + construction [J]")
-    ax.legend()
+    fig = create_construction_plot(log_scale)
 
     st.pyplot(fig)
-    st.caption(f"Figure {references.ref_figure('cmb')}")
+    st.caption(f"Figure {references.ref_figure('cmb')}")
\ No newline at end of file
@@ -1,11 +1,13 @@
 import streamlit as st
 import shared.streamlit_utils as su
-import plotly.express as px
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 
 import energy_efficient_algorithms.compression_emissions as compr
+import energy_efficient_algorithms.index_selection as isel
 from shared.references import References
+from shared.caching import cache_data
 from shared.common_text import EXPERIMENT_SYSTEM_TEXT
 
 references = References()
@@ -73,6 +75,8 @@ st.write("The uncompressed file would emit ${:.2f} \\,{}\\, {}$ per year. ".form
 
 emissions_variant_row = st.columns([1, 2, 1])
 
+# the last interval of the lower envelope is the index with the smallest emissions per query
+*_, (_, rlz_optimal_from, _) = isel.optimal_index_intervals(*isel.index_costs("einstein", ["move-r", "move-r-lzend", "move-r-rlz"]))
 st.write("Now, we can add the emissions from the storage to the emissions from the construction and the queries. "
          f"The total emissions per year and per query amount can be seen in figure {references.ref_figure('cmb')}. "
          f"It is apparent that the emissions for the construction of a compressed text index combined with the reduced "
@@ -80,7 +84,7 @@ st.write("Now, we can add the emissions from the storage to the emissions from t
          f"If one plans to execute less than 5 million locate queries, then the move-r or move-r-lzend index would be the best choice to reduce emissions. "
          f"Furthermore, move-r emits less than move-r-lzend for every reasonable large amount of queries, " +
          "even though move-r is about {:.2f}% slower than move-r-lzend. ".format(100 * (compr.measured_locate_data['einstein']['8']['time']['move-r'] - compr.measured_locate_data['einstein']['8']['time']['move-r-lzend']) / compr.measured_locate_data['einstein']['8']['time']['move-r']) +
-         f"Move-r-rlz emits the least amount of {CO2_EQ} when the amount of queries exceeds 7 million.")
+         f"Move-r-rlz emits the least amount of {CO2_EQ} when the amount of queries exceeds {rlz_optimal_from / 1e6:.0f} million.")
 
 emissions_all_row = st.columns([1, 2, 1])
 
@@ -93,98 +97,121 @@ st.write(references.make_references_section())
 
 # run-time heavy loading at the end
 used_algos = ["move-r", "move-r-lzend", "move-r-rlz"]
-with emissions_variant_row[1]:
-    fig = px.bar(
-        x=used_algos,
-        y=[compr.disk_co2_emissions(compr.idx_sizes["einstein"][algo]) for algo in used_algos],
-        height=500,
-        labels={
-            "x": "Emissions for the storage of the compressed text indices",
-            "y": f"CO2 eq. per year [g/y]"
-        }
-    )
-
-    st.plotly_chart(fig, width='content')
-    st.caption(f"Figure {references.ref_figure('em_size')}")
-
-with emissions_all_row[1]:
-    all_emissions_tabs = st.tabs(["all", "move-r", "move-r-lzend", "move-r-rlz"])
 
+def create_emissions_grid(coordinates: np.ndarray) -> np.ndarray:
+    return compr.co2_emissions_grid(
+        [compr.idx_sizes["einstein"][algo] for algo in used_algos],
+        [compr.measured_construction_data["einstein"]["eng"][algo] for algo in used_algos],
+        [compr.measured_locate_data["einstein"]["8"]["eng"][algo] / compr.measured_locate_data["einstein"]["8"]["iter"] for algo in used_algos],
+        coordinates
+    )
 
-with all_emissions_tabs[0]:
-    log_scale = st.toggle("Logarithmic scale", value=True)
+@cache_data
+def all_emissions_series() -> list[pd.Series]:
+    coordinates = 200_000 * np.arange(1, 1000)
 
-    coordinates = [200_000 * i for i in range(1, 1000)]
+    total_emissions = create_emissions_grid(coordinates).sum(axis=2)
 
     emission_series = [pd.Series(
-        [compr.all_co2_emissions(
-            compr.idx_sizes["einstein"][key],
-            compr.measured_construction_data["einstein"]["eng"][key],
-            compr.measured_locate_data["einstein"]["8"]["eng"][key] / compr.measured_locate_data["einstein"]["8"]["iter"],
-            c
-        ) for c in coordinates],
+        total_emissions[j],
         index=coordinates,
         name=key
-    ) for key in used_algos]
+    ) for j, key in enumerate(used_algos)]
 
-    fig, ax = plt.subplots()
+    uncompressed_series = pd.Series([uncompressed_file_disk_emissions], index=coordinates[0:1], name="uncompressed")
+    return emission_series + [uncompressed_series]
+
+def create_all_emissions_plot(log_scale: bool):
+    *emission_series, uncompressed_series = all_emissions_series()
+
+    fig = Figure()
+    ax = fig.subplots()
 
     for series, color in zip(emission_series, ["#009E73", "#0072B2", "#E69F00"]):
         series.plot(ax=ax, marker=None, color=color, logy=log_scale, logx=log_scale)
 
-    uncompressed_series = pd.Series([uncompressed_file_disk_emissions], index=coordinates[0:1], name="uncompressed")
     uncompressed_series.plot(ax=ax, marker="o", color="black", logy=log_scale, logx=log_scale)
 
     ax.set_xlabel("Queries")
     ax.set_ylabel(f"{CO2_EQ} per year and queries [g]")
     ax.legend()
 
-    st.pyplot(fig)
-    st.caption(f"Figure {references.ref_figure('cmb')}")
+    return fig
 
-log_scales: list[None | bool] = [None, None, None]
-for i, algo in enumerate(used_algos):
-    with all_emissions_tabs[i+1]:
-        log_scales[i] = st.toggle("Logarithmic scale", value=True, key=str(i))
+@cache_data
+def algo_emissions_series(algo: str) -> list[pd.Series]:
+    coordinates = 200_000 * np.arange(1, 1000)
 
-        coordinates = [200_000 * i for i in range(1, 1000)]
+    em_storage, em_construction, em_query = create_emissions_grid(coordinates)[used_algos.index(algo)].T
 
-        em_storage = [compr.disk_co2_emissions(compr.idx_sizes["einstein"][algo]) for _ in coordinates]
-        em_construction = [compr.joule_to_co2(compr.measured_construction_data["einstein"]["eng"][algo]) for _ in coordinates]
-        em_query = [compr.joule_to_co2((compr.measured_locate_data["einstein"]["8"]["eng"][algo] / compr.measured_locate_data["einstein"]["8"]["iter"]) * c) for c in coordinates]
+    size_series = pd.Series(
+        em_storage,
+        index=coordinates,
+        name="emissions from storage"
+    )
 
-        size_series = pd.Series(
-            em_storage,
-            index=coordinates,
-            name="emissions from storage"
-        )
+    construction_series = pd.Series(
+        em_construction,
+        index=coordinates,
+        name="emissions from construction"
+    )
 
-        construction_series = pd.Series(
-            em_construction,
-            index=coordinates,
-            name="emissions from construction"
-        )
+    query_series = pd.Series(
+        em_query,
+        index=coordinates,
+        name="emissions from queries"
+    )
 
-        query_series = pd.Series(
-            em_query,
-            index=coordinates,
-            name="emissions from queries"
-        )
+    total_series = pd.Series(
+        em_storage + em_construction + em_query,
+        index=coordinates,
+        name="total emissions"
+    )
 
-        total_series = pd.Series(
-            [srg + cst + qry for srg, cst, qry in zip(em_storage, em_construction, em_query)],
-            index=coordinates,
-            name="total emissions"
-        )
+    return [size_series, construction_series, query_series, total_series]
 
-        fig, ax = plt.subplots()
+def create_algo_emissions_plot(algo: str, log_scale: bool):
+    fig = Figure()
+    ax = fig.subplots()
 
-        for series, color in zip([size_series, construction_series, query_series, total_series], ["#009E73", "#0072B2", "#E69F00", "black"]):
-            series.plot(ax=ax, marker=None, color=color, logy=log_scales[i], logx=log_scales[i])
+    for series, color in zip(algo_emissions_series(algo), ["#009E73", "#0072B2", "#E69F00", "black"]):
+        series.plot(ax=ax, marker=None, color=color, logy=log_scale, logx=log_scale)
+
+    ax.set_xlabel("Queries")
+    ax.set_ylabel(f"{CO2_EQ} per year and queries [g]")
+    ax.legend()
+
+    return fig
+
+with emissions_variant_row[1]:
+    fig = su.create_bar_chart(
+        tuple(used_algos),
+        tuple([compr.disk_co2_emissions(compr.idx_sizes["einstein"][algo]) for algo in used_algos]),
+        "Emissions for the storage of the compressed text indices",
+        f"CO2 eq. per year [g/y]"
+    )
+
+    st.plotly_chart(fig, width='content')
+    st.caption(f"Figure {references.ref_figure('em_size')}")
+
+with emissions_all_row[1]:
+    all_emissions_tabs = st.tabs(["all", "move-r", "move-r-lzend", "move-r-rlz"])
+
+
+with all_emissions_tabs[0]:
+    log_scale = st.toggle("Logarithmic scale", value=True)
+
+    fig = create_all_emissions_plot(log_scale)
+
+    st.pyplot(fig)
+    st.caption(f"Figure {references.ref_figure('cmb')}")
+
+log_scales: list[None | bool] = [None, None, None]
+for i, algo in enumerate(used_algos):
+    with all_emissions_tabs[i+1]:
+        log_scales[i] = st.toggle("Logarithmic scale", value=True, key=str(i))
 
-        ax.set_xlabel("Queries")
-        ax.set_ylabel(f"{CO2_EQ} per year and queries [g]")
-        ax.legend()
+        fig = create_algo_emissions_plot(algo, log_scales[i])
 
         st.pyplot(fig)
         st.caption(f"Figure {references.ref_figure(f'solo_{i}')}")
\ No newline at end of file
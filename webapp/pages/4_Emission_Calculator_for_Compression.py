@@ -1,10 +1,12 @@
 import streamlit as st
 import shared.streamlit_utils as su
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 
 import energy_efficient_algorithms.compression_emissions as compr
 from shared.references import References
+from shared.caching import cache_data
 
 references = References()
 
@@ -14,22 +16,13 @@ su.c_set_page_config(PAGE_TITLE)
 
 st.title(PAGE_TITLE)
 
-idx_size = st.number_input("Size in MB of your index", value=10.0)
-joule_construction = st.number_input("Energy needed for construction [Joule]", value=150.0)
-joule_per_1000_queries = st.number_input("Joule per 1000 queries", value=4.0, help="Queries can be whatever you like, e.g. locate-queries, count-queries or plain decompression of intervals.")
-
-log_scale = st.toggle("Logarithmic scale", value=True)
-
-if st.button("Calculate"):
-    indices = [10**i for i in range(11)]
-
-    st.write("## Results")
+@cache_data(max_entries=256)
+def calculator_series(idx_size: float, joule_construction: float, joule_per_1000_queries: float, text_size: float, appends_per_day: float,
+                      megabyte_per_append: float, incremental: bool) -> list[pd.Series]:
+    coordinates = 200_000 * np.arange(1, 1000)
 
-    coordinates = [200_000 * i for i in range(1, 1000)]
-
-    em_storage = [compr.disk_co2_emissions(idx_size) for _ in coordinates]
-    em_construction = [compr.joule_to_co2(joule_construction) for _ in coordinates]
-    em_query = [compr.joule_to_co2((joule_per_1000_queries / 1000) * c) for c in coordinates]
+    em_storage, em_construction, em_query = compr.co2_emissions_grid(idx_size, joule_construction, joule_per_1000_queries / 1000, coordinates,
+                                                                      text_size, appends_per_day, megabyte_per_append, incremental)[0].T
 
     size_series = pd.Series(
         em_storage,
@@ -40,7 +33,7 @@ if st.button("Calculate"):
     construction_series = pd.Series(
         em_construction,
         index=coordinates,
-        name="emissions from construction"
+        name="emissions from construction" if appends_per_day == 0 else "emissions from construction and rebuilds"
     )
 
     query_series = pd.Series(
@@ -50,22 +43,61 @@ if st.button("Calculate"):
     )
 
     total_series = pd.Series(
-        [srg + cst + qry for srg, cst, qry in zip(em_storage, em_construction, em_query)],
+        em_storage + em_construction + em_query,
         index=coordinates,
         name="total emissions"
     )
 
-    fig, ax = plt.subplots()
+    return [size_series, construction_series, query_series, total_series]
+
+def create_calculator_plot(idx_size: float, joule_construction: float, joule_per_1000_queries: float, text_size: float, appends_per_day: float,
+                           megabyte_per_append: float, incremental: bool, log_scale: bool):
+    fig = Figure()
+    ax = fig.subplots()
 
-    for series, color in zip([size_series, construction_series, query_series, total_series], ["#009E73", "#0072B2", "#E69F00", "black"]):
+    for series, color in zip(calculator_series(idx_size, joule_construction, joule_per_1000_queries, text_size, appends_per_day, megabyte_per_append, incremental),
+                             ["#009E73", "#0072B2", "#E69F00", "black"]):
         series.plot(ax=ax, marker=None, color=color, logy=log_scale, logx=log_scale)
 
     ax.set_xlabel("Queries")
     ax.set_ylabel("CO2 eq per year and queries [g]")
     ax.legend()
 
+    return fig
+
+idx_size = st.number_input("Size in MB of your index", value=10.0)
+joule_construction = st.number_input("Energy needed for construction [Joule]", value=150.0)
+joule_per_1000_queries = st.number_input("Joule per 1000 queries", value=4.0, help="Queries can be whatever you like, e.g. locate-queries, count-queries or plain decompression of intervals. "
+                                                                                           "The decompression of intervals is measured per index with text_index.py extract.")
+
+text_size = st.number_input("Size in MB of the indexed text", value=compr.file_sizes["einstein"], min_value=0.001)
+appends_per_day = st.number_input("Appends per day", value=0.0, min_value=0.0, help="The text grows by appends and the index is rebuilt after every append.")
+megabyte_per_append = st.number_input("Size in MB of one append", value=1.0, min_value=0.0)
+index_kind = st.selectbox("Kind of index", ["sa", "move-r", "move-r-lzend", "move-r-rlz"],
+                          format_func=lambda kind: "suffix array (text_index.py)" if kind == "sa" else kind)
+incremental = st.toggle("Incremental rebuild", value=False, disabled=index_kind not in compr.INCREMENTAL_INDICES,
+                        help="Only sort the appended text and merge it into the existing index instead of rebuilding the whole index, "
+                             "only the suffix array supports appends. The construction energy is assumed to grow linearly with the text, "
+                             "the merge costs a small share of a full construction per MB of the existing text.")
+incremental = incremental and index_kind in compr.INCREMENTAL_INDICES
+
+log_scale = st.toggle("Logarithmic scale", value=True)
+
+if st.button("Calculate"):
+    indices = [10**i for i in range(11)]
+
+    st.write("## Results")
+
+    fig = create_calculator_plot(idx_size, joule_construction, joule_per_1000_queries, text_size, appends_per_day, megabyte_per_append, incremental, log_scale)
+
     st.pyplot(fig)
     st.caption(f"Figure {references.ref_figure(f'solo')}")
 
+    if appends_per_day > 0:
+        yearly_energy = compr.yearly_construction_energy(joule_construction, text_size, appends_per_day, megabyte_per_append, incremental)
+        st.write(f"With {appends_per_day:g} appends of {megabyte_per_append:g} MB per day the construction and the "
+                 f"{'incremental' if incremental else 'full'} rebuilds need {yearly_energy / 1000:.1f} kJ per year, "
+                 f"{yearly_energy / joule_construction:.1f} times the initial construction.")
+
     st.write("Curious how this is calculated? Take a loot at:")
     st.page_link("pages/3_Emissions_and_Compression.py", label="Emissions and Compression")
@@ -0,0 +1,52 @@
+import functools
+import threading
+from collections import Counter
+
+import streamlit as st
+
+# the counters live in the server process and are shared by all sessions
+_lock = threading.Lock()
+_calls: Counter = Counter()
+_misses: Counter = Counter()
+
+def _tracked(streamlit_cache, func=None, **cache_kwargs):
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        # the body of the cached function only runs on a cache miss
+        @functools.wraps(func)
+        def counting_func(*args, **kwargs):
+            with _lock:
+                _misses[name] += 1
+            return func(*args, **kwargs)
+
+        cached_func = streamlit_cache(**cache_kwargs)(counting_func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _lock:
+                _calls[name] += 1
+            return cached_func(*args, **kwargs)
+
+        wrapper.clear = cached_func.clear
+        return wrapper
+
+    return decorator if func is None else decorator(func)
+
+def cache_data(func=None, **cache_kwargs):
+    # st.cache_data (returns a copy on every call) with hit rate tracking
+    return _tracked(st.cache_data, func, **cache_kwargs)
+
+def cache_resource(func=None, **cache_kwargs):
+    # st.cache_resource (returns the same object on every call, it must not be mutated) with hit rate tracking
+    return _tracked(st.cache_resource, func, **cache_kwargs)
+
+def cache_statistics() -> dict[str, dict[str, float]]:
+    with _lock:
+        return {
+            name: {
+                "calls": calls,
+                "hits": calls - _misses[name],
+                "hit_rate": (calls - _misses[name]) / calls,
+            } for name, calls in sorted(_calls.items())
+        }
@@ -1,35 +1,48 @@
+import os
+
 import bibtexparser
 
+from shared.caching import cache_data
+
+
+@cache_data
+def load_references(references_filename: str, mtime: float) -> dict[str, str]:
+    # parsing the bib file is expensive, it is only repeated if the file changed (mtime is part of the cache key)
+    with open(references_filename, "r") as references_bib_file:
+        bibtex_str = references_bib_file.read()
+
+    references_db = bibtexparser.loads(bibtex_str)
+
+    references_str = {}
+
+    for entry in references_db.entries:
+        authors = entry.get("author", "").replace(" and", ", ").replace("\n", "")
+        title = entry.get("title", "")
+        year = entry.get("year", "")
+        pages = entry.get("pages", "").replace("--", "-")
+        book_title = entry.get("booktitle", "").replace("\n", "")
+        doi = entry.get("url", "")
+        article_journal = entry.get("journal", "")
+        volume = entry.get("volume", "")
+        number = entry.get("number", "")
+        how_published = entry.get("howpublished", "")
+        note = entry.get("note", "")
+
+        if entry['ENTRYTYPE'] == "inproceedings":
+            references_str[entry['ID']] = \
+                f"{authors}. {title}. In: {book_title}, pp. {pages} ({year}). [{doi}]({doi})"
+        elif entry['ENTRYTYPE'] == "article":
+            references_str[entry['ID']] = f"{authors}. {title}. {article_journal}, vol. {volume}, no. {number}, pp. {pages} ({year}). [{doi}]({doi})"
+        elif entry['ENTRYTYPE'] == "misc":
+            references_str[entry['ID']] = f"{authors}. {title} ({year}). {note}. [{how_published}]({how_published})"
+
+    return references_str
+
 class References:
 
     def __init__(self, references_filename="webapp/static/references.bib"):
-        with open(references_filename, "r") as references_bib_file:
-            bibtex_str = references_bib_file.read()
-
-        references_db = bibtexparser.loads(bibtex_str)
-
-        self.references_str = {}
-
-        for entry in references_db.entries:
-            authors = entry.get("author", "").replace(" and", ", ").replace("\n", "")
-            title = entry.get("title", "")
-            year = entry.get("year", "")
-            pages = entry.get("pages", "").replace("--", "-")
-            book_title = entry.get("booktitle", "").replace("\n", "")
-            doi = entry.get("url", "")
-            article_journal = entry.get("journal", "")
-            volume = entry.get("volume", "")
-            number = entry.get("number", "")
-            how_published = entry.get("howpublished", "")
-            note = entry.get("note", "")
-
-            if entry['ENTRYTYPE'] == "inproceedings":
-                self.references_str[entry['ID']] = \
-                    f"{authors}. {title}. In: {book_title}, pp. {pages} ({year}). [{doi}]({doi})"
-            elif entry['ENTRYTYPE'] == "article":
-                self.references_str[entry['ID']] = f"{authors}. {title}. {article_journal}, vol. {volume}, no. {number}, pp. {pages} ({year}). [{doi}]({doi})"
-            elif entry['ENTRYTYPE'] == "misc":
-                self.references_str[entry['ID']] = f"{authors}. {title} ({year}). {note}. [{how_published}]({how_published})"
+        # the parsed references are cached, the citation and figure numbers are per page run
+        self.references_str = load_references(references_filename, os.path.getmtime(references_filename))
 
         # citations
         self.citations_nr: dict[str, None | int] = {bib_id: None for bib_id in self.references_str.keys()}
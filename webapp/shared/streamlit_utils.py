@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+import plotly.express as px
 import energy_efficient_algorithms.compression_emissions as compr
+from shared.caching import cache_data, cache_resource, cache_statistics
 
 def c_set_page_config(page_title="Energy Efficient Algorithms"):
     st.set_page_config(
@@ -9,9 +12,30 @@ def c_set_page_config(page_title="Energy Efficient Algorithms"):
         page_title=page_title,
         page_icon="⚡")
 
-def create_compressed_text_idx_plot(compressed_text_idx, filename, indices=tuple([10**(i+2) for i in range(11)])):
+@cache_resource
+def create_bar_chart(x: tuple, y: tuple, x_label: str, y_label: str, y_low: None | tuple = None, y_high: None | tuple = None, height: int = 500):
+    # y_low and y_high are drawn as error bars, e.g. the confidence intervals of measurement_analysis
+    error_bars = {}
+    if y_low is not None and y_high is not None:
+        error_bars = {
+            "error_y": np.maximum(np.asarray(y_high) - np.asarray(y), 0),
+            "error_y_minus": np.maximum(np.asarray(y) - np.asarray(y_low), 0),
+        }
+    return px.bar(
+        x=x,
+        y=y,
+        height=height,
+        labels={
+            "x": x_label,
+            "y": y_label
+        },
+        **error_bars
+    )
+
+@cache_data
+def compressed_text_idx_emissions(compressed_text_idx, filename, indices=tuple([10**(i+2) for i in range(11)])) -> list[pd.Series]:
     disk_emissions = compr.disk_co2_emissions(compr.idx_sizes[filename][compressed_text_idx])
-    query_emissions = [compr.query_co2_emissions(c, compr.query_energy_usage[filename][compressed_text_idx]) for c in indices]
+    query_emissions = compr.query_co2_emissions(np.array(indices), compr.query_energy_usage[filename][compressed_text_idx])
 
     query_emissions_series = pd.Series(
         query_emissions,
@@ -20,24 +44,36 @@ def create_compressed_text_idx_plot(compressed_text_idx, filename, indices=tuple
     )
 
     disk_emissions_series = pd.Series(
-        [disk_emissions for _ in range(len(query_emissions))],
+        np.full(len(indices), disk_emissions),
         index=indices,
         name="Emissions of disk usage"
     )
 
     total_emissions_series = pd.Series(
-        [disk_emissions + qe for qe in query_emissions],
+        disk_emissions + query_emissions,
         index=indices,
         name="Total emissions"
     )
 
-    fig, ax = plt.subplots()
-    query_emissions_series.plot(ax=ax, marker="o", logy=True, logx=True)
-    disk_emissions_series.plot(ax=ax, marker="o", logy=True, logx=True)
-    total_emissions_series.plot(ax=ax, marker="o", logy=True, logx=True)
+    return [query_emissions_series, disk_emissions_series, total_emissions_series]
+
+def create_compressed_text_idx_plot(compressed_text_idx, filename, indices=tuple([10**(i+2) for i in range(11)])):
+    # only the data of the figures is cached, matplotlib is not thread-safe, so every run (and session) draws its own
+    # Figure without pyplot
+    fig = Figure()
+    ax = fig.subplots()
+    for series in compressed_text_idx_emissions(compressed_text_idx, filename, indices):
+        series.plot(ax=ax, marker="o", logy=True, logx=True)
 
     ax.set_xlabel("Queries")
     ax.set_ylabel("CO2 eq [g]")
     ax.legend()
 
-    return fig
\ No newline at end of file
+    return fig
+
+def show_cache_statistics():
+    statistics = cache_statistics()
+    if len(statistics) > 0:
+        st.dataframe(pd.DataFrame.from_dict(statistics, orient="index"))
+    else:
+        st.write("No cached function was called yet.")
\ No newline at end of file